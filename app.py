@@ -1,15 +1,39 @@
+import re
+
+import numpy as np
+import pandas as pd
 import streamlit as st
-from functions import load_data, generate_data_for_display, generate_plot
+from functions import COMPONENT_OPTIONS, concurrent_reactions_from_display
+from plots import DETAIL_MODES, DETAIL_THRESHOLD
+from pile_check import build_load_index
+from pile_groups import DEFAULT_SPACING, design_pile_groups
+from reaction_store import from_frame, store_envelope, top_combinations
+from combination_index import build_combination_index
+from equilibrium import combination_totals, level_totals, check_totals
+from export import export_bytes
+from cache import cache_key, derived, lookup, invalidate
+from jobs import ParseCancelled, start_parse
+from figure_cache import get_figure, warm_figures, clear as clear_figures
+import diagnostics
 import os
 
+# Range of the pile capacity inputs and of the capacity sweep [kN]
+MIN_PILE_CAPACITY, MAX_PILE_CAPACITY, PILE_CAPACITY_STEP = 100.0, 10000.0, 25.0
 
 
 def main():
     st.title('TSD Support Reactions')
 
+    # Optional per-stage timings, rendered at the end of the run
+    if st.sidebar.checkbox('Show diagnostics'):
+        diagnostics.enable(trace_memory=st.sidebar.checkbox('Trace peak memory (slower)'))
+    else:
+        diagnostics.disable()
+    diagnostics_panel = st.sidebar.container()
+
     # Option to upload file or use example file
     st.sidebar.header('Upload your Excel file')
-    uploaded_file = st.sidebar.file_uploader("Upload Excel file", type=['xls', 'xlsx'])
+    uploaded_file = st.sidebar.file_uploader("Upload Excel file (or a CSV / Parquet reaction table)", type=['xls', 'xlsx', 'csv', 'parquet'])
 
     use_example = st.sidebar.checkbox('Use example Excel file')
     example_file_path = 'TSD Steel Frame Example.xlsx'  # Default example file path
@@ -18,12 +42,14 @@ def main():
         if os.path.exists(example_file_path):
             file_path = example_file_path
         else:
+            cancel_parse()
             st.sidebar.error('Example file not found. Please upload your own Excel file.')
             return
     elif uploaded_file:
         file_path = uploaded_file
         
     else:
+        cancel_parse()
         st.sidebar.warning('Please upload an Excel file or choose to use the example file.')
         return
 
@@ -36,27 +62,206 @@ def main():
         (Note: Wall supports are beyond scope)
         """)
 
-    # Load the data
-    df_data = load_data(file_path)
+    if st.sidebar.button('Clear cached results'):
+        invalidate()
+        clear_figures()
 
-    # Generate the data for display
-    new_df = generate_data_for_display(df_data)
+    # Load the data and generate the data for display, reusing cached tables for files seen before.
+    # New files are parsed in a background job so the page stays responsive; the file format is
+    # detected from its content and xlsx rows are streamed
+    file_key = cache_key(file_path)
+    tables = lookup(file_key)
+    if tables is None:
+        tables = parse_in_background(file_path, file_key)
+        if tables is None:
+            return
+    df_data, new_df = tables
+    # One reaction array per file (or subset), shared by the tables below
+    store = derived((file_key, 'store'), lambda: from_frame(df_data))
+
+    # Stages timed on the parse worker thread
+    job = st.session_state.get('parse_job')
+    if job is not None and job.key == file_key and job.done():
+        diagnostics.extend(job.records)
 
     # Plot initial coordinates
-   
-    st.plotly_chart(generate_plot("Coordinates", new_df))
+    show_plot(file_key, "Coordinates", new_df)
+
+    # Optional subset of combinations, enveloped with masked reductions on the reaction array
+    combination_index = build_combination_index(df_data['Combination'].unique())
+    counts = combination_index.counts()
+    subsets = st.multiselect('Combination subsets (all when empty):', combination_index.classes,
+                             format_func=lambda name: f'{name} ({counts[name]})')
+    pattern = st.text_input('Combination name pattern (regular expression, optional):')
+    if subsets or pattern:
+        try:
+            mask = combination_index.mask(include=subsets, pattern=pattern)
+        except re.error as error:
+            st.error(f'Invalid pattern: {error}')
+            return
+        if not mask.any():
+            st.warning('No combination matches the selected subsets.')
+            return
+        # The index was built in first-appearance order, the same order as the store's combinations
+        new_df = store_envelope(store, mask, concurrent=True)
+        df_data = df_data[df_data['Combination'].isin(combination_index.combinations[mask])]
+        file_key = f"{file_key}:{','.join(subsets)}:{pattern}"
+        store = derived((file_key, 'store'), lambda: from_frame(df_data))
 
     # Dropdown menu for selecting the maximum forces and moments
-    option = st.selectbox('Choose an option:', ["Number of Piles", 'Maximum Fx', 'Maximum Fy', 'Maximum Fz', 'Maximum Mx', 'Maximum My', 'Maximum Mz'])
+    options = ["Number of Piles", 'Maximum Fx', 'Maximum Fy', 'Maximum Fz', 'Maximum Mx', 'Maximum My', 'Maximum Mz']
+    option = st.selectbox('Choose an option:', options)
 
     # Inputs for safe pile capacity and tensile capacity
-    safe_pile_capacity = st.number_input('Safe Pile Axial Capacity [kN]:', min_value=100.0, max_value=10000.0, step=1.0, value=600.0)
+    safe_pile_capacity = st.number_input('Safe Pile Axial Capacity [kN]:', min_value=MIN_PILE_CAPACITY, max_value=MAX_PILE_CAPACITY, step=1.0, value=600.0)
     safe_pile_tensile_capacity = st.number_input('Safe Pile Tensile Capacity [kN] (optional, enter negative value):', value=-100.0)
     st.write("(Note: Wall supports are beyond scope)")
 
+    # Level of detail of the component bar charts, large models default to the top supports
+    detail = None
+    if option in COMPONENT_OPTIONS:
+        detail = select_detail_options(len(new_df))
+
     # Button to generate the plot
     if st.button('Generate Now'):
-        st.plotly_chart(generate_plot(option, new_df, safe_pile_capacity, safe_pile_tensile_capacity))
+        show_plot(file_key, option, new_df, safe_pile_capacity, safe_pile_tensile_capacity, detail=detail)
+
+        # Build the other options in the background so switching between them is instant
+        warm_figures(file_key, new_df, [other for other in options if other != option], safe_pile_capacity, safe_pile_tensile_capacity, detail)
+
+    # Concurrent reactions at the combinations governing the selected component
+    if option in COMPONENT_OPTIONS:
+        with st.expander('Concurrent reactions'):
+            component = COMPONENT_OPTIONS[option]
+            # new_df carries the concurrent columns, of the subset when one is selected
+            st.dataframe(concurrent_reactions_from_display(new_df, [component]), hide_index=True)
+
+        # Whether a support is governed by one outlier or by several close combinations
+        with st.expander('Top governing combinations'):
+            k = st.number_input('Combinations per support and sign:', min_value=1, max_value=20, value=3, step=1)
+            top = derived((file_key, 'top', int(k), component), lambda: top_combinations(store, int(k), components=[component]))
+            st.dataframe(top, hide_index=True)
+
+    # Capacity what-if sweep from the sorted load index, without recomputing the envelope
+    if option == 'Number of Piles':
+        with st.expander('Pile capacity sweep'):
+            try:
+                load_index = build_load_index(new_df, safe_pile_tensile_capacity)
+            except ValueError as error:
+                st.error(f'Could not sweep the pile capacity: {error}')
+            else:
+                capacities = np.arange(MIN_PILE_CAPACITY, MAX_PILE_CAPACITY + PILE_CAPACITY_STEP / 2, PILE_CAPACITY_STEP)
+                st.line_chart(load_index.total_piles(capacities), x_label='Safe Pile Axial Capacity [kN]', y_label='Total Piles')
+
+                compare_capacity = st.slider('Compare with capacity [kN]:', min_value=MIN_PILE_CAPACITY, max_value=MAX_PILE_CAPACITY,
+                                             step=PILE_CAPACITY_STEP, value=float(safe_pile_capacity))
+                histogram = load_index.histogram([safe_pile_capacity, compare_capacity])
+                st.bar_chart(histogram.T.rename(columns=lambda capacity: f'{capacity:g} kN'), x_label='Number of Piles', y_label='Supports', stack=False)
+                st.dataframe(load_index.changed_supports(safe_pile_capacity, compare_capacity), hide_index=True)
+
+        # Pile groups sized for the pile loads from Fz, Mx and My instead of Fz alone
+        with st.expander('Moment-aware pile groups'):
+            spacing = st.number_input('Pile spacing [m]:', min_value=0.3, max_value=10.0, value=DEFAULT_SPACING, step=0.1)
+            design_inputs = (safe_pile_capacity, safe_pile_tensile_capacity, spacing)
+            try:
+                groups = derived((file_key, 'pile groups', design_inputs), lambda: design_pile_groups(store, *design_inputs))
+            except ValueError as error:
+                st.error(f'Could not design the pile groups: {error}')
+            else:
+                governed = groups['Number of Piles'] > groups['Axial Only Piles']
+                st.write(f"{int(groups['Number of Piles'].sum())} piles in total, {int(governed.sum())} supports need more piles than from Fz alone")
+                st.dataframe(groups, hide_index=True)
+
+    # Summed reactions per combination and per Z level, to compare with the applied loads
+    with st.expander('Equilibrium check'):
+        columns = st.columns(3)
+        origin = [column.number_input(f'Origin {axis} [m]:', value=0.0, step=1.0) for column, axis in zip(columns, 'XYZ')]
+        totals = derived((file_key, 'combination totals', tuple(origin)), lambda: combination_totals(store, origin))
+        expected_file = st.file_uploader('Expected totals (CSV with a Combination column and any of the total columns, optional)', type=['csv'])
+        if expected_file is not None:
+            try:
+                checked = check_totals(totals, pd.read_csv(expected_file))
+            except ValueError as error:
+                st.error(f'Could not check the expected totals: {error}')
+            else:
+                st.write(f"{int(checked['Deviates'].sum())} of {len(checked)} checked combinations deviate from the expected totals")
+                st.dataframe(checked, hide_index=True)
+        st.dataframe(totals, hide_index=True)
+        st.dataframe(derived((file_key, 'level totals'), lambda: level_totals(store)), hide_index=True)
+
+    # Envelope and pile schedule downloads, generated only when the button is clicked
+    with st.expander('Export'):
+        file_format = st.radio('Format:', ['xlsx', 'csv'], horizontal=True)
+        table = 'Envelope'
+        if file_format == 'csv':
+            table = st.selectbox('Table:', ['Envelope', 'Pile Schedule', 'Combination Checks'])
+        per_combination = file_format == 'csv' and table == 'Combination Checks'
+        if file_format == 'xlsx':
+            per_combination = st.checkbox('Include per-combination pile checks')
+        file_name = 'pile_schedule.xlsx' if file_format == 'xlsx' else f"{table.lower().replace(' ', '_')}.csv"
+        st.download_button(
+            'Download',
+            data=lambda: export_bytes(table, file_format, new_df, store, safe_pile_capacity, safe_pile_tensile_capacity, per_combination),
+            file_name=file_name,
+        )
+
+    if diagnostics.is_enabled():
+        with diagnostics_panel.expander('Diagnostics', expanded=True):
+            st.dataframe(diagnostics.records_frame(), hide_index=True)
+            st.download_button('Download diagnostics (JSON lines)', diagnostics.to_json_lines(), file_name='diagnostics.jsonl')
+
+def cancel_parse():
+    job = st.session_state.pop('parse_job', None)
+    if job is not None and not job.done():
+        job.cancel()
+
+def parse_in_background(file_path, file_key):
+    # A job for a different file than the current one is superseded and cancelled
+    job = st.session_state.get('parse_job')
+    if job is None or job.key != file_key:
+        cancel_parse()
+        job = st.session_state['parse_job'] = start_parse(file_path, file_key)
+
+    if not job.done():
+        show_parse_progress(job)
+        return None
+
+    try:
+        return job.result()
+    except ParseCancelled:
+        return None
+    except ValueError as error:
+        st.error(f'Could not read the file: {error}')
+        return None
+
+@st.fragment(run_every=0.5)
+def show_parse_progress(job):
+    if job.done():
+        st.rerun()
+    text = f'Parsing: {job.rows:,} rows and {job.supports:,} supports processed'
+    st.progress(job.fraction or 0.0, text=text)
+
+def select_detail_options(supports):
+    with st.expander('Bar chart detail', expanded=supports > DETAIL_THRESHOLD):
+        mode = st.radio('Show:', DETAIL_MODES, index=int(supports > DETAIL_THRESHOLD), horizontal=True)
+        detail = {'mode': mode}
+        if mode == 'Top supports':
+            detail['top_n'] = int(st.number_input('Number of supports:', min_value=1, max_value=supports, value=min(50, supports), step=10))
+        elif mode == 'Page':
+            detail['page_size'] = int(st.number_input('Supports per page:', min_value=10, max_value=1000, value=100, step=10))
+            pages = -(-supports // detail['page_size'])
+            detail['page'] = int(st.number_input(f'Page (of {pages}, sorted by magnitude):', min_value=1, max_value=pages, value=1, step=1)) - 1
+        elif mode == 'Gridline band':
+            detail['band_axis'] = st.radio('Band along:', ['X', 'Y'], horizontal=True)
+            detail['band_width'] = float(st.number_input('Band width [m]:', min_value=0.1, value=6.0, step=0.5))
+    return detail
+
+def show_plot(file_key, option, new_df, *capacities, detail=None):
+    with diagnostics.stage(f'generate_plot {option}') as record:
+        fig = get_figure(file_key, option, new_df, *capacities, detail=detail)
+        record['Supports'] = len(new_df)
+    with diagnostics.stage(f'plotly_chart {option}'):
+        st.plotly_chart(fig)
 
 if __name__ == '__main__':
     main()
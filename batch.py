@@ -0,0 +1,116 @@
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from functions import load_data, generate_data_for_display, calculate_required_piles
+
+WORKBOOK_EXTENSIONS = ('.xlsx', '.xls', '.csv', '.parquet')
+
+
+def find_workbooks(inputs):
+    # Inputs may be workbook paths, directories or glob patterns
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = sorted(glob.glob(os.path.join(item, '*')))
+        else:
+            candidates = sorted(glob.glob(item)) or [item]
+        paths.extend(path for path in candidates
+                     if path.lower().endswith(WORKBOOK_EXTENSIONS) and not os.path.basename(path).startswith('~$'))
+
+    # Keep the first occurrence of files matched by several inputs
+    return list(dict.fromkeys(paths))
+
+
+def summary_name(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0] + '_summary.csv'
+
+
+def summary_names(workbooks):
+    # One summary per workbook; workbooks with the same name in different directories (rev1/tower.xlsx,
+    # rev2/tower.xlsx) get a numeric suffix, compared case-insensitively for case-insensitive file systems
+    names, used = [], set()
+    for path in workbooks:
+        stem, suffix = os.path.splitext(os.path.basename(path))[0], 1
+        name = summary_name(path)
+        while name.lower() in used:
+            suffix += 1
+            name = f'{stem}_{suffix}_summary.csv'
+        used.add(name.lower())
+        names.append(name)
+    return names
+
+
+def process_workbook(file_path, summary_path, safe_pile_capacity, safe_pile_tensile_capacity=None):
+    start = time.perf_counter()
+    record = {'File': file_path, 'Summary': '', 'Status': 'ok', 'Error': '',
+              'Supports': 0, 'Combinations': 0, 'Total Piles': 0, 'Seconds': 0.0}
+    try:
+        df_data = load_data(file_path, streaming=True)
+        new_df = generate_data_for_display(df_data)
+        new_df['Number of Piles'] = calculate_required_piles(new_df, safe_pile_capacity, safe_pile_tensile_capacity).astype(int)
+        new_df.to_csv(summary_path, index=False)
+
+        record.update({
+            'Summary': summary_path,
+            'Supports': len(new_df),
+            'Combinations': df_data['Combination'].nunique(),
+            'Total Piles': int(new_df['Number of Piles'].sum()),
+        })
+    except Exception as error:  # A bad workbook must not stop the batch
+        record.update({'Status': 'failed', 'Error': f'{type(error).__name__}: {error}'})
+
+    record['Seconds'] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def run_batch(inputs, output_dir, safe_pile_capacity=600.0, workers=None, safe_pile_tensile_capacity=None):
+    workbooks = find_workbooks(inputs)
+    summaries = [os.path.join(output_dir, name) for name in summary_names(workbooks)]
+    os.makedirs(output_dir, exist_ok=True)
+
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(process_workbook, path, summary_path, safe_pile_capacity, safe_pile_tensile_capacity)
+                   for path, summary_path in zip(workbooks, summaries)]
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            if record['Status'] == 'failed':
+                print(f"FAILED {record['File']}: {record['Error']}", file=sys.stderr)
+            else:
+                print(f"ok     {record['File']} ({record['Supports']} supports, {record['Seconds']} s)")
+
+    index = pd.DataFrame(records, columns=['File', 'Summary', 'Status', 'Error', 'Supports',
+                                           'Combinations', 'Total Piles', 'Seconds'])
+    index = index.sort_values('File', ignore_index=True)
+    index.to_csv(os.path.join(output_dir, 'index.csv'), index=False)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Process TSD Foundation Reaction exports into envelope and pile summaries.')
+    parser.add_argument('inputs', nargs='+', help='Workbooks or CSV/Parquet reaction tables, directories or glob patterns')
+    parser.add_argument('-o', '--output', default='summaries', help='Output directory (default: summaries)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Number of worker processes (default: CPU count)')
+    parser.add_argument('-c', '--capacity', type=float, default=600.0, help='Safe pile axial capacity [kN] (default: 600)')
+    parser.add_argument('-t', '--tensile-capacity', type=float, default=None,
+                        help='Safe pile tensile capacity [kN], a negative value (default: uplift not checked)')
+    args = parser.parse_args(argv)
+    if args.tensile_capacity is not None and args.tensile_capacity >= 0:
+        parser.error('the tensile capacity must be a negative value')
+
+    index = run_batch(args.inputs, args.output, args.capacity, args.workers, args.tensile_capacity)
+    if index.empty:
+        print('No workbooks found', file=sys.stderr)
+        return 1
+    return 1 if (index['Status'] == 'failed').any() else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from functions import load_data, generate_data_for_display
+from plots import generate_plot
+from synthetic import write_workbook
+
+# Excel sheets are limited to 1,048,576 rows; larger cases of the size matrix are skipped
+MAX_SHEET_ROWS = 1_048_576 - 20
+
+DEFAULT_SUPPORTS = [100, 1000, 10000]
+DEFAULT_COMBINATIONS = [10, 100, 1000]
+
+# Modules used by headless workers, which must import without the plotting and UI dependencies and
+# within IMPORT_BUDGET seconds on top of numpy and pandas themselves
+HEADLESS_MODULES = ['functions', 'reaction_store', 'pile_check', 'equilibrium', 'revisions', 'cache', 'batch']
+HEAVY_MODULES = ['plotly', 'streamlit', 'openpyxl', 'shapely']
+IMPORT_BUDGET = 0.05
+
+
+def stages(file_path):
+    # (name, callable) pairs in pipeline order; each callable gets the previous stage's outputs
+    return [
+        ('load_data', lambda state: state.update(df_data=load_data(file_path))),
+        ('load_data streaming', lambda state: state.update(df_data=load_data(file_path, streaming=True))),
+        ('generate_data_for_display', lambda state: state.update(new_df=generate_data_for_display(state['df_data']))),
+        ('generate_plot Coordinates', lambda state: generate_plot('Coordinates', state['new_df'])),
+        ('generate_plot Maximum Fz', lambda state: generate_plot('Maximum Fz', state['new_df'])),
+        ('generate_plot Number of Piles', lambda state: generate_plot('Number of Piles', state['new_df'], 600.0, -100.0)),
+    ]
+
+
+def measure(stage, state, memory):
+    gc.collect()
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    stage(state)
+    seconds = time.perf_counter() - start
+    peak = 0
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def run_case(file_path, supports, combinations, repeats=1, memory=True):
+    results = []
+    timing_state = {}
+    memory_state = {}
+    for name, stage in stages(file_path):
+        # Best of `repeats` timed runs, plus one separate run under tracemalloc since tracing slows code down
+        seconds = min(measure(stage, timing_state, memory=False)[0] for _ in range(repeats))
+        peak = measure(stage, memory_state, memory=True)[1] if memory else 0
+        results.append({
+            'Stage': name,
+            'Supports': supports,
+            'Combinations': combinations,
+            'Seconds': round(seconds, 6),
+            'Peak MB': round(peak / 1e6, 3) if memory else None,
+        })
+    return results
+
+
+def run_benchmarks(supports_sizes=DEFAULT_SUPPORTS, combination_sizes=DEFAULT_COMBINATIONS, repeats=1, memory=True, workdir=None):
+    results = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for supports in supports_sizes:
+            for combinations in combination_sizes:
+                if supports * combinations > MAX_SHEET_ROWS:
+                    print(f'skip   {supports} x {combinations} (exceeds the Excel row limit)', file=sys.stderr)
+                    continue
+                file_path = os.path.join(tmp, f'synthetic_{supports}x{combinations}.xlsx')
+                write_workbook(file_path, supports, combinations)
+                for result in run_case(file_path, supports, combinations, repeats, memory):
+                    print(f"{result['Supports']:>6} x {result['Combinations']:<5} {result['Stage']:<32} "
+                          f"{result['Seconds']:>10.4f} s  {result['Peak MB'] or 0:>9.1f} MB")
+                    results.append(result)
+                os.remove(file_path)
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'repeats': repeats,
+        },
+        'results': results,
+    }
+
+
+def import_time(module, repeats=3):
+    # Best cold import time of `module` in fresh interpreters, total and on top of numpy and pandas,
+    # and the heavy modules it pulled in
+    code = ('import sys, time; start = time.perf_counter(); import numpy, pandas; middle = time.perf_counter(); '
+            'import {module}; end = time.perf_counter(); '
+            'print(end - start, end - middle, *[name for name in {heavy!r} if name in sys.modules])'
+            ).format(module=module, heavy=HEAVY_MODULES)
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+        runs.append((float(output[0]), float(output[1]), output[2:]))
+    return min(runs, key=lambda run: run[1])
+
+
+def check_imports(modules=HEADLESS_MODULES, budget=IMPORT_BUDGET, repeats=3):
+    results = []
+    for module in modules:
+        seconds, overhead, heavy = import_time(module, repeats)
+        results.append({
+            'Module': module,
+            'Seconds': round(seconds, 4),
+            'Over numpy/pandas': round(overhead, 4),
+            'Heavy Modules': ', '.join(heavy),
+            'Within Budget': overhead <= budget and not heavy,
+        })
+    return pd.DataFrame(results)
+
+
+def compare(baseline, current, threshold=0.2):
+    # Flag stages that got slower (or used more memory) than the baseline by more than `threshold`
+    keys = ['Stage', 'Supports', 'Combinations']
+    merged = pd.DataFrame(baseline['results']).merge(pd.DataFrame(current['results']), on=keys, suffixes=(' Baseline', ''))
+    merged['Time Ratio'] = merged['Seconds'] / merged['Seconds Baseline']
+    merged['Memory Ratio'] = merged['Peak MB'] / merged['Peak MB Baseline']
+    merged['Regression'] = (merged['Time Ratio'] > 1 + threshold) | (merged['Memory Ratio'] > 1 + threshold)
+    return merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark load_data, generate_data_for_display and generate_plot on synthetic workbooks.')
+    parser.add_argument('-s', '--supports', type=int, nargs='+', default=DEFAULT_SUPPORTS)
+    parser.add_argument('-c', '--combinations', type=int, nargs='+', default=DEFAULT_COMBINATIONS)
+    parser.add_argument('-r', '--repeats', type=int, default=1, help='Timed runs per stage, the best is kept')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc peak memory runs')
+    parser.add_argument('-o', '--output', default='bench_output.json', help='Where to write the results (JSON)')
+    parser.add_argument('--baseline', help='Results JSON of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Relative slowdown flagged as a regression (default: 0.2)')
+    parser.add_argument('--imports', action='store_true',
+                        help=f'Only check the cold import time of the headless modules against the budget ({IMPORT_BUDGET} s over numpy/pandas)')
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        imports = check_imports(repeats=max(args.repeats, 3))
+        print(imports.to_string(index=False))
+        return 0 if imports['Within Budget'].all() else 1
+
+    current = run_benchmarks(args.supports, args.combinations, args.repeats, not args.no_memory)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = compare(baseline, current, args.threshold)
+        regressions = comparison[comparison['Regression']]
+        if not regressions.empty:
+            print('Regressions:', file=sys.stderr)
+            print(regressions[['Stage', 'Supports', 'Combinations', 'Time Ratio', 'Memory Ratio']].to_string(index=False), file=sys.stderr)
+            return 1
+        print('No regressions')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import pandas as pd
+
+import diagnostics
+from functions import PARSER_VERSION, load_data, generate_data_for_display
+
+CACHE_DIR = os.environ.get('TSD_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'tsd_reactions'))
+MAX_CACHE_BYTES = int(os.environ.get('TSD_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# Parsed tables of the most recently used files are also kept in memory
+MEMORY_ENTRIES = 8
+
+DATA_FILE = 'data.parquet'
+ENVELOPE_FILE = 'envelope.parquet'
+
+# Tables computed from the parsed tables (reaction stores, pile groups, totals), kept in memory
+# only under tuple keys starting with the file key
+DERIVED_ENTRIES = 16
+
+_memory = OrderedDict()
+_derived = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def read_bytes(file_path):
+    # Works for paths and for file-like objects such as Streamlit uploads
+    if hasattr(file_path, 'getvalue'):
+        return file_path.getvalue()
+    if hasattr(file_path, 'read'):
+        position = file_path.tell()
+        content = file_path.read()
+        file_path.seek(position)
+        return content
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+def cache_key(file_path):
+    # Content address: the workbook bytes plus the parser version that produced the tables
+    digest = hashlib.sha256(read_bytes(file_path))
+    digest.update(f'parser-{PARSER_VERSION}'.encode())
+    return digest.hexdigest()
+
+
+def entry_size(entry_path):
+    return sum(entry.stat().st_size for entry in os.scandir(entry_path) if entry.is_file())
+
+
+def read_cache(key, cache_dir=CACHE_DIR):
+    entry_path = os.path.join(cache_dir, key)
+    try:
+        df_data = pd.read_parquet(os.path.join(entry_path, DATA_FILE))
+        new_df = pd.read_parquet(os.path.join(entry_path, ENVELOPE_FILE))
+    except (FileNotFoundError, OSError):
+        return None
+
+    # Mark the entry as recently used for LRU eviction
+    now = time.time()
+    os.utime(entry_path, (now, now))
+    return df_data, new_df
+
+
+def write_cache(key, df_data, new_df, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    os.makedirs(cache_dir, exist_ok=True)
+    entry_path = os.path.join(cache_dir, key)
+
+    # Write into a private directory first so readers never see a half-written entry
+    tmp_path = os.path.join(cache_dir, f'.tmp-{uuid.uuid4().hex}')
+    os.makedirs(tmp_path)
+    try:
+        df_data.to_parquet(os.path.join(tmp_path, DATA_FILE))
+        new_df.to_parquet(os.path.join(tmp_path, ENVELOPE_FILE))
+        try:
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            # Another session or worker wrote the same key first; entries are content addressed,
+            # so its tables are the same ones
+            if not os.path.isdir(entry_path):
+                raise
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+    evict(cache_dir, max_bytes)
+
+
+def cache_entries(cache_dir=CACHE_DIR):
+    # Entry directories only, named by their sha256 key; anything else in cache_dir is left alone
+    if not os.path.isdir(cache_dir):
+        return []
+    return [entry for entry in os.scandir(cache_dir)
+            if entry.is_dir() and len(entry.name) == 64 and all(c in '0123456789abcdef' for c in entry.name)]
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    # Remove least recently used entries until the cache fits in max_bytes
+    entries = cache_entries(cache_dir)
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+
+    total = 0
+    for entry in entries:
+        total += entry_size(entry.path)
+        if total > max_bytes:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def invalidate(key=None, cache_dir=CACHE_DIR):
+    # Drop one entry, or every entry when no key is given
+    with _memory_lock:
+        if key is None:
+            _memory.clear()
+            _derived.clear()
+        else:
+            _memory.pop(key, None)
+            # Subset keys extend the file key, 'key:subsets:pattern'
+            for derived_key in [k for k in _derived if k[0].startswith(key)]:
+                del _derived[derived_key]
+
+    if key is None:
+        for entry in cache_entries(cache_dir):
+            shutil.rmtree(entry.path, ignore_errors=True)
+    else:
+        shutil.rmtree(os.path.join(cache_dir, key), ignore_errors=True)
+
+
+def remember(key, tables):
+    with _memory_lock:
+        _memory[key] = tables
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def derived(key, compute):
+    # compute() once per key, e.g. ('<file key>', 'store'); the least recently used results are dropped
+    with _memory_lock:
+        if key in _derived:
+            _derived.move_to_end(key)
+            return _derived[key]
+    value = compute()
+    with _memory_lock:
+        _derived[key] = value
+        _derived.move_to_end(key)
+        while len(_derived) > DERIVED_ENTRIES:
+            _derived.popitem(last=False)
+    return value
+
+
+def lookup(key, cache_dir=CACHE_DIR):
+    # Tables are looked up in memory first, then on disk; None on a miss
+    with diagnostics.stage('cache lookup') as record:
+        with _memory_lock:
+            cached = _memory.get(key)
+            if cached is not None:
+                _memory.move_to_end(key)
+        record['Cache'] = 'memory'
+        if cached is None:
+            cached = read_cache(key, cache_dir)
+            record['Cache'] = 'miss' if cached is None else 'disk'
+        if cached is not None:
+            record['Rows'] = len(cached[0])
+            record['Supports'] = len(cached[1])
+    if cached is not None:
+        remember(key, cached)
+    return cached
+
+
+def load_cached(file_path, streaming=True, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, key=None, progress=None,
+                checkpoint=None):
+    # `checkpoint()` is called between stages; an exception raised by it (or by `progress`) aborts the load
+    checkpoint = checkpoint or (lambda: None)
+    key = key or cache_key(file_path)
+    cached = lookup(key, cache_dir)
+    if cached is not None:
+        return cached
+
+    checkpoint()
+    with diagnostics.stage('load_data') as record:
+        df_data = load_data(file_path, streaming=streaming, progress=progress)
+        record['Rows'] = len(df_data)
+
+    checkpoint()
+    with diagnostics.stage('generate_data_for_display') as record:
+        new_df = generate_data_for_display(df_data, concurrent=True)
+        record['Supports'] = len(new_df)
+
+    checkpoint()
+    with diagnostics.stage('cache write'):
+        write_cache(key, df_data, new_df, cache_dir, max_bytes)
+    remember(key, (df_data, new_df))
+    return df_data, new_df
@@ -0,0 +1,60 @@
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+# Default classes from TSD combination names such as '25 (Final) STR8.5-1.35G+1.5ψ0Q+1.5ψ0S+1.5W+EHFDir2+'
+DEFAULT_PATTERNS = {
+    'ULS': r'STR|ULS',
+    'SLS': r'SLS|SER',
+    'Imposed': r'Q',
+    'Snow': r'\dS(?![A-Z])|ψ\dS',
+    'Wind': r'W(?![a-z])',
+    'EHF': r'EHF',
+}
+
+
+@dataclass
+class CombinationIndex:
+    # One boolean mask per class over the combinations, computed once
+    combinations: np.ndarray
+    classes: list
+    masks: np.ndarray
+
+    def mask(self, include=None, exclude=None, pattern=None, match_all=False):
+        # Combinations in any (or, with match_all, every) class of `include`, minus those in
+        # `exclude`, optionally narrowed to names matching a regular expression
+        selected = np.ones(len(self.combinations), dtype=bool)
+        if include:
+            rows = self.masks[[self.classes.index(name) for name in include]]
+            selected = rows.all(axis=0) if match_all else rows.any(axis=0)
+        if exclude:
+            selected &= ~self.masks[[self.classes.index(name) for name in exclude]].any(axis=0)
+        if pattern:
+            selected &= match(self.combinations, pattern)
+        return selected
+
+    def counts(self):
+        return dict(zip(self.classes, self.masks.sum(axis=1).tolist()))
+
+
+def match(combinations, pattern):
+    regex = re.compile(pattern)
+    return np.fromiter((regex.search(str(name)) is not None for name in combinations), dtype=bool, count=len(combinations))
+
+
+def build_combination_index(combinations, patterns=DEFAULT_PATTERNS, tags=None):
+    # `patterns` maps class names to regular expressions on the combination name, `tags` maps
+    # class names to explicit lists of combination names
+    combinations = np.asarray(combinations, dtype=object)
+    classes = []
+    masks = []
+    for name, pattern in (patterns or {}).items():
+        classes.append(name)
+        masks.append(match(combinations, pattern))
+    for name, tagged in (tags or {}).items():
+        classes.append(name)
+        masks.append(np.isin(combinations, list(tagged)))
+
+    masks = np.array(masks, dtype=bool).reshape(len(classes), len(combinations))
+    return CombinationIndex(combinations=combinations, classes=classes, masks=masks)
@@ -0,0 +1,22 @@
+import argparse
+import sys
+
+from functions import convert_to_parquet
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert TSD Foundation Reaction workbooks to Parquet reaction tables.')
+    parser.add_argument('inputs', nargs='+', help='Workbooks to convert')
+    parser.add_argument('-o', '--output', help='Output path (only with a single input, default: next to the workbook)')
+    args = parser.parse_args(argv)
+
+    if args.output and len(args.inputs) > 1:
+        parser.error('--output can only be used with a single input')
+
+    for file_path in args.inputs:
+        print(convert_to_parquet(file_path, args.output))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger('tsd.diagnostics')
+
+# Records are kept per thread, so concurrent Streamlit sessions do not mix their timings
+_state = threading.local()
+
+
+def enable(trace_memory=False):
+    # Tracing peak memory with tracemalloc slows the traced code down several times,
+    # so wall times are only comparable between runs with the same setting
+    _state.records = []
+    _state.trace_memory = trace_memory
+
+
+def disable():
+    _state.records = None
+
+
+def is_enabled():
+    if not hasattr(_state, 'records'):
+        _state.records = [] if os.environ.get('TSD_DIAGNOSTICS') == '1' else None
+        _state.trace_memory = os.environ.get('TSD_DIAGNOSTICS_MEMORY') == '1'
+    return _state.records is not None
+
+
+def traces_memory():
+    return is_enabled() and _state.trace_memory
+
+
+def records():
+    return list(_state.records) if is_enabled() else []
+
+
+def extend(stage_records):
+    # Add records collected on another thread, e.g. by a background parse job
+    if is_enabled():
+        _state.records.extend(stage_records)
+
+
+@contextmanager
+def stage(name, **fields):
+    # Time one pipeline stage. The yielded dict can be filled with counts (rows, supports, cache, ...).
+    # When diagnostics are disabled this only costs a flag check
+    record = dict(fields)
+    if not is_enabled():
+        yield record
+        return
+
+    # Peak memory is only traced for the outermost stage, tracemalloc cannot be nested
+    trace_memory = _state.trace_memory and not tracemalloc.is_tracing()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['Stage'] = name
+        record['Seconds'] = round(time.perf_counter() - start, 6)
+        record['Peak MB'] = None
+        if trace_memory:
+            record['Peak MB'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 3)
+            tracemalloc.stop()
+        _state.records.append(record)
+        logger.info(json.dumps(record, default=str))
+
+
+def records_frame():
+    columns = ['Stage', 'Seconds', 'Peak MB', 'Rows', 'Supports', 'Cache']
+    frame = pd.DataFrame(records())
+    return frame.reindex(columns=list(dict.fromkeys(columns + list(frame.columns))))
+
+
+def to_json_lines():
+    return ''.join(json.dumps(record, default=str) + '\n' for record in records())
+
+
+def export(file_path):
+    with open(file_path, 'a', encoding='utf-8') as f:
+        f.write(to_json_lines())
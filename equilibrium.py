@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from functions import REACTION_COLUMNS
+
+OVERTURNING_COLUMNS = ['Overturning Mx [kNm]', 'Overturning My [kNm]', 'Overturning Mz [kNm]']
+TOTAL_COLUMNS = REACTION_COLUMNS + OVERTURNING_COLUMNS
+
+
+def selected(store, mask=None):
+    # Combination codes and reactions of the selected combinations; a view when all are selected
+    if mask is None:
+        return np.arange(len(store.combinations)), store.reactions
+    combinations = np.flatnonzero(np.asarray(mask, dtype=bool))
+    return combinations, store.reactions[:, combinations]
+
+
+def reaction_totals(reactions, coordinates, origin=(0.0, 0.0, 0.0)):
+    # Summed reactions and overturning moments about `origin` over the support axis of a
+    # (supports, combinations, 6) array, shape (combinations, 9). Missing rows count as zero
+    values = np.nan_to_num(reactions)
+    forces = values[:, :, :3]
+    arms = coordinates - np.asarray(origin, dtype=float)
+
+    totals = values.sum(axis=0)
+    # first[k, c, j] = sum over supports of arm k times force j, one BLAS contraction; the
+    # overturning moment adds r x F of the support forces to the support moments
+    first = np.tensordot(arms, forces, axes=(0, 0))
+    overturning = totals[:, 3:] + np.stack([
+        first[1, :, 2] - first[2, :, 1],
+        first[2, :, 0] - first[0, :, 2],
+        first[0, :, 1] - first[1, :, 0],
+    ], axis=1)
+    return np.concatenate([totals, overturning], axis=1)
+
+
+def combination_totals(store, origin=(0.0, 0.0, 0.0), mask=None):
+    # Per-combination totals of a ReactionStore, the global equilibrium of each combination
+    combinations, reactions = selected(store, mask)
+
+    totals = pd.DataFrame(reaction_totals(reactions, store.coordinates, origin), columns=TOTAL_COLUMNS)
+    totals.insert(0, 'Combination', store.combinations[combinations])
+    totals.insert(1, 'Supports', (~np.isnan(reactions[:, :, 0])).sum(axis=0))
+    return totals
+
+
+def level_totals(store, mask=None):
+    # Per Z level and combination subtotals of the reactions (base shear and axial load per level)
+    combinations, reactions = selected(store, mask)
+    values = np.nan_to_num(reactions)
+    present = (~np.isnan(reactions[:, :, 0])).astype(float)
+
+    levels, level_codes = np.unique(store.coordinates[:, 2], return_inverse=True)
+    # One-hot (levels, supports) matrix, so every subtotal is a single matrix product
+    membership = np.zeros((len(levels), len(store.supports)))
+    membership[level_codes, np.arange(len(store.supports))] = 1.0
+
+    subtotals = (membership @ values.reshape(len(store.supports), -1)).reshape(-1, len(REACTION_COLUMNS))
+    counts = membership @ present
+
+    totals = pd.DataFrame(subtotals, columns=REACTION_COLUMNS)
+    totals.insert(0, 'Z Coordinate', np.repeat(levels, len(combinations)))
+    totals.insert(1, 'Combination', np.tile(store.combinations[combinations], len(levels)))
+    totals.insert(2, 'Supports', counts.ravel().astype(int))
+    return totals
+
+
+def check_totals(totals, expected, relative_tolerance=0.01, absolute_tolerance=1.0):
+    # Compare combination_totals() against expected totals. `expected` is a DataFrame with a
+    # 'Combination' column and any of the total columns, or {combination: {column: value}}.
+    # A total deviates when |difference| > absolute_tolerance + relative_tolerance * |expected|
+    if not isinstance(expected, pd.DataFrame):
+        expected = pd.DataFrame.from_dict(expected, orient='index').rename_axis('Combination').reset_index()
+    columns = [column for column in TOTAL_COLUMNS if column in expected.columns]
+    if not columns:
+        raise ValueError("Expected totals need at least one of the columns " + ', '.join(TOTAL_COLUMNS))
+
+    merged = totals[['Combination'] + columns].merge(expected[['Combination'] + columns], on='Combination',
+                                                     how='inner', suffixes=('', ' Expected'))
+    actual = merged[columns].to_numpy(dtype=float)
+    target = merged[[f'{column} Expected' for column in columns]].to_numpy(dtype=float)
+    difference = actual - target
+    # Columns left empty in `expected` are not checked
+    deviates = (np.abs(difference) > absolute_tolerance + relative_tolerance * np.abs(target)) & ~np.isnan(target)
+
+    result = pd.DataFrame({'Combination': merged['Combination']})
+    for i, column in enumerate(columns):
+        result[column] = actual[:, i]
+        result[f'{column} Expected'] = target[:, i]
+        result[f'{column} Difference'] = difference[:, i]
+    result['Deviating Columns'] = [', '.join(np.asarray(columns)[row]) for row in deviates]
+    result['Deviates'] = deviates.any(axis=1)
+    return result
@@ -0,0 +1,114 @@
+import csv
+import io
+import math
+
+import numpy as np
+import openpyxl
+
+from pile_check import check_piles
+
+# Supports per chunk when generating the per-combination check rows
+CHUNK_SUPPORTS = 500
+
+# Rows of an Excel worksheet, header included; openpyxl's write-only mode does not enforce it
+MAX_SHEET_ROWS = 1_048_576
+
+
+def clean(value):
+    # openpyxl and spreadsheet readers cannot handle NaN, numpy scalars are converted to Python ones
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def frame_rows(frame):
+    # Header row followed by the data rows of a DataFrame, one at a time
+    yield list(frame.columns)
+    yield from frame.itertuples(index=False, name=None)
+
+
+def combination_check_rows(store, schedule, safe_pile_capacity, safe_pile_tensile_capacity=None, chunk_supports=CHUNK_SUPPORTS):
+    # Per support and combination pile check rows for the piles chosen in `schedule` (from check_piles).
+    # Rows are generated a chunk of supports at a time, so they never exist all at once
+    yield ['Support', 'Combination', 'Fz [kN]', 'Number of Piles', 'Compression Utilisation', 'Tension Utilisation']
+
+    piles = schedule['Number of Piles'].to_numpy(dtype=float)
+    combinations = store.combinations
+    for start in range(0, len(store.supports), chunk_supports):
+        stop = start + chunk_supports
+        fz = store.component('Fz')[start:stop]
+        chunk_piles = piles[start:stop, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            compression = np.clip(fz, 0, None) / (chunk_piles * safe_pile_capacity)
+            if safe_pile_tensile_capacity is None:
+                tension = np.full_like(fz, np.nan)
+            else:
+                tension = np.clip(-fz, 0, None) / (chunk_piles * -safe_pile_tensile_capacity)
+
+        for i, support in enumerate(store.supports[start:stop]):
+            for j in np.flatnonzero(~np.isnan(fz[i])):
+                yield (support, combinations[j], fz[i, j], int(chunk_piles[i, 0]), compression[i, j], tension[i, j])
+
+
+def write_xlsx(target, tables, max_rows=MAX_SHEET_ROWS):
+    # Write {sheet name: rows} to an xlsx file or file-like object with openpyxl's write-only
+    # mode, which streams rows to disk instead of keeping the worksheet in memory. A table longer
+    # than max_rows continues on numbered sheets ('Combination Checks 2', ...) under the same header
+    workbook = openpyxl.Workbook(write_only=True)
+    for name, rows in tables.items():
+        rows = iter(rows)
+        sheet = workbook.create_sheet(name)
+        header = next(rows, None)
+        if header is None:
+            continue
+        header = [clean(value) for value in header]
+        sheet.append(header)
+        sheet_rows, part = 1, 1
+        for row in rows:
+            if sheet_rows == max_rows:
+                part += 1
+                sheet = workbook.create_sheet(f'{name} {part}')
+                sheet.append(header)
+                sheet_rows = 1
+            sheet.append([clean(value) for value in row])
+            sheet_rows += 1
+    workbook.save(target)
+    return target
+
+
+def write_csv(target, rows):
+    # Write one table to a CSV path or text file-like object
+    if isinstance(target, str):
+        with open(target, 'w', newline='', encoding='utf-8') as f:
+            return write_csv(f, rows)
+
+    writer = csv.writer(target)
+    for row in rows:
+        writer.writerow(['' if value is None else value for value in map(clean, row)])
+    return target
+
+
+def export_tables(new_df, store=None, safe_pile_capacity=None, safe_pile_tensile_capacity=None, per_combination=False):
+    # Envelope, pile schedule and optional per-combination checks as {name: rows}
+    tables = {'Envelope': frame_rows(new_df)}
+    if store is not None and safe_pile_capacity is not None:
+        schedule = check_piles(store, safe_pile_capacity, safe_pile_tensile_capacity)
+        tables['Pile Schedule'] = frame_rows(schedule)
+        if per_combination:
+            tables['Combination Checks'] = combination_check_rows(store, schedule, float(safe_pile_capacity), safe_pile_tensile_capacity)
+    return tables
+
+
+def export_xlsx(target, new_df, store=None, safe_pile_capacity=None, safe_pile_tensile_capacity=None, per_combination=False):
+    tables = export_tables(new_df, store, safe_pile_capacity, safe_pile_tensile_capacity, per_combination)
+    return write_xlsx(target, tables)
+
+
+def export_bytes(table, file_format, new_df, store=None, safe_pile_capacity=None, safe_pile_tensile_capacity=None, per_combination=False):
+    # In-memory export for download buttons: the whole workbook for 'xlsx', one table for 'csv'
+    tables = export_tables(new_df, store, safe_pile_capacity, safe_pile_tensile_capacity, per_combination)
+    if file_format == 'xlsx':
+        return write_xlsx(io.BytesIO(), tables).getvalue()
+    return write_csv(io.StringIO(), tables[table]).getvalue().encode('utf-8')
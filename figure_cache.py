@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from functions import COMPONENT_OPTIONS
+from plots import generate_plot
+
+# Figures of the most recently used (file, option, capacities, detail) combinations
+MAX_FIGURES = 64
+
+_figures = OrderedDict()
+_pending = {}
+_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='figure-warmup')
+
+
+def figure_key(file_key, option, safe_pile_capacity=None, safe_pile_tensile_capacity=None, detail=None):
+    # `detail` is a dict of select_detail() options, stored as sorted items so the key is hashable.
+    # It only applies to the component charts, and showing all supports is the same as no detail
+    detail = dict(detail or {})
+    if option not in COMPONENT_OPTIONS or detail.get('mode', 'All supports') == 'All supports':
+        detail = {}
+    return (file_key, option, safe_pile_capacity, safe_pile_tensile_capacity, tuple(sorted(detail.items())))
+
+
+def store(key, fig):
+    with _lock:
+        _figures[key] = fig
+        _figures.move_to_end(key)
+        while len(_figures) > MAX_FIGURES:
+            _figures.popitem(last=False)
+
+
+def get_figure(file_key, option, new_df, safe_pile_capacity=None, safe_pile_tensile_capacity=None, detail=None):
+    # Memoized generate_plot; `file_key` identifies the uploaded file, e.g. cache.cache_key()
+    key = figure_key(file_key, option, safe_pile_capacity, safe_pile_tensile_capacity, detail)
+    with _lock:
+        fig = _figures.get(key)
+        if fig is not None:
+            _figures.move_to_end(key)
+            return fig
+        pending = _pending.get(key)
+
+    # A figure being warmed in the background is awaited rather than built twice
+    if pending is not None:
+        return pending.result()
+
+    fig = generate_plot(option, new_df, safe_pile_capacity, safe_pile_tensile_capacity, detail=detail)
+    store(key, fig)
+    return fig
+
+
+def build(key, new_df):
+    try:
+        fig = generate_plot(key[1], new_df, key[2], key[3], detail=dict(key[4]))
+        store(key, fig)
+        return fig
+    finally:
+        with _lock:
+            _pending.pop(key, None)
+
+
+def warm_figures(file_key, new_df, options, safe_pile_capacity=None, safe_pile_tensile_capacity=None, detail=None):
+    # Build the figures of `options` in a background thread so switching to them later is instant
+    for option in options:
+        key = figure_key(file_key, option, safe_pile_capacity, safe_pile_tensile_capacity, detail)
+        with _lock:
+            if key in _figures or key in _pending:
+                continue
+            _pending[key] = _executor.submit(build, key, new_df)
+
+
+def clear(file_key=None):
+    with _lock:
+        for key in [key for key in _figures if file_key is None or key[0] == file_key]:
+            del _figures[key]
@@ -1,17 +1,69 @@
+import os
+
+import numpy as np
 import pandas as pd
-import plotly.graph_objs as go
-import plotly.colors
-from plotly.subplots import make_subplots
 
+COMPONENTS = ['Fx', 'Fy', 'Fz', 'Mx', 'My', 'Mz']
+COORDINATE_COLUMNS = ['X Coordinate', 'Y Coordinate', 'Z Coordinate']
+REACTION_COLUMNS = ['Fx [kN]', 'Fy [kN]', 'Fz [kN]', 'Mx [kNm]', 'My [kNm]', 'Mz [kNm]']
+DATA_COLUMNS = ['Support'] + COORDINATE_COLUMNS + ['Combination'] + REACTION_COLUMNS
+
+SHEET_NAME = 'Foundation Reactions'
+HEADER_ROWS = 7
+WALL_SUPPORTS_MARKER = 'Wall Supports'
+
+# Rows between progress callbacks of the streaming loader
+PROGRESS_ROWS = 1000
+
+FILE_SIGNATURES = {'xlsx': b'PK\x03\x04', 'xls': b'\xd0\xcf\x11\xe0', 'parquet': b'PAR1'}
+
+# Bump whenever load_data or generate_data_for_display change their output, so cached tables are re-parsed
+PARSER_VERSION = 2
+
+COMPONENT_OPTIONS = {f'Maximum {component}': component for component in COMPONENTS}
+COMPONENT_UNITS = {'Fx': 'kN', 'Fy': 'kN', 'Fz': 'kN', 'Mx': 'kNm', 'My': 'kNm', 'Mz': 'kNm'}
+
+# Plotting lives in plots.py and is only imported when one of these names is first used, so
+# headless callers (batch workers, envelope and pile calculations) never load plotly
+PLOT_NAMES = {'WEBGL_THRESHOLD', 'DETAIL_MODES', 'GROUP_MODES', 'DETAIL_THRESHOLD',
+              'hover_text', 'select_detail', 'generate_component_plot', 'generate_plot'}
+
+
+def detect_format(file_path):
+    # Sniff the leading bytes: xlsx is a zip archive, xls an OLE2 compound file, Parquet starts
+    # with PAR1; anything else is treated as CSV
+    if hasattr(file_path, 'read'):
+        position = file_path.tell()
+        magic = file_path.read(8)
+        file_path.seek(position)
+    else:
+        with open(file_path, 'rb') as f:
+            magic = f.read(8)
+
+    for file_format, signature in FILE_SIGNATURES.items():
+        if magic.startswith(signature):
+            return file_format
+    return 'csv'
+
+def load_data(file_path, streaming=False, progress=None):
+    # Reaction tables exported as CSV or Parquet skip the Excel parsing entirely. Legacy xls
+    # files cannot be streamed by openpyxl and always go through pandas
+    file_format = detect_format(file_path)
+    if file_format in ('csv', 'parquet'):
+        return load_table(file_path, file_format)
+    if streaming and file_format == 'xlsx':
+        return index_data(stream_data(file_path, progress))
 
-def load_data(file_path):
     # Load the data, skipping the first 7 rows
-    df_data = pd.read_excel(file_path, sheet_name='Foundation Reactions', skiprows=7, header=None)
+    df_data = pd.read_excel(file_path, sheet_name=SHEET_NAME, skiprows=HEADER_ROWS, header=None)
     df_data.columns = ['Support', "X Coordinate", "Y Coordinate", "Z Coordinate", "TBR", "TBR", "TBR", "Combination", "Fx [kN]", "Fy [kN]", "Fz [kN]", "Mx [kNm]", "My [kNm]", "Mz [kNm]"]
     df_data.drop(df_data.columns[[4, 5, 6]], axis=1, inplace=True)
     
     # Find the row with "Wall Supports"
-    wall_supports_index = df_data[df_data['Support'] == 'Wall Supports'].index[0]
+    wall_supports_rows = df_data[df_data['Support'] == WALL_SUPPORTS_MARKER].index
+    if wall_supports_rows.empty:
+        raise ValueError(f"'{WALL_SUPPORTS_MARKER}' row not found in the '{SHEET_NAME}' sheet")
+    wall_supports_index = wall_supports_rows[0]
     
     # Remove two rows before and all rows after "Wall Supports"
     df_data = df_data.iloc[:wall_supports_index - 2]
@@ -21,6 +73,91 @@ def load_data(file_path):
     df_data_first_part = df_data_first_part.ffill(axis=0)
     df_data = pd.concat([df_data_first_part, df_data_rest], axis=1)
 
+    return index_data(df_data)
+
+def stream_data(file_path, progress=None):
+    # Read the sheet lazily row by row, keeping only the needed columns and
+    # stopping at "Wall Supports" instead of parsing the whole sheet.
+    # progress(rows, supports, total_rows) is called every PROGRESS_ROWS rows; total_rows is None
+    # when the sheet does not declare its size. An exception raised by progress aborts the read
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        # The same error as pd.read_excel for a workbook without the sheet
+        if SHEET_NAME not in workbook.sheetnames:
+            raise ValueError(f"Worksheet named '{SHEET_NAME}' not found")
+        sheet = workbook[SHEET_NAME]
+        total_rows = sheet.max_row - HEADER_ROWS if sheet.max_row else None
+        rows = sheet.iter_rows(min_row=HEADER_ROWS + 1, max_col=14, values_only=True)
+        columns = {column: [] for column in DATA_COLUMNS}
+        last = [None, None, None, None]
+        found_marker = False
+        supports = 0
+
+        for count, row in enumerate(rows):
+            if progress is not None and count % PROGRESS_ROWS == 0:
+                progress(count, supports, total_rows)
+
+            row = tuple(row) + (None,) * (14 - len(row))
+            if row[0] == WALL_SUPPORTS_MARKER:
+                found_marker = True
+                break
+            if row[0] is not None:
+                supports += 1
+
+            # Forward-fill Support and coordinates while reading
+            for i in range(4):
+                if row[i] is not None:
+                    last[i] = row[i]
+                columns[DATA_COLUMNS[i]].append(last[i])
+            for column, value in zip(DATA_COLUMNS[4:], row[7:14]):
+                columns[column].append(value)
+    finally:
+        workbook.close()
+
+    if not found_marker:
+        raise ValueError(f"'{WALL_SUPPORTS_MARKER}' row not found in the '{SHEET_NAME}' sheet")
+
+    # Remove the two rows before "Wall Supports"
+    df_data = pd.DataFrame({column: values[:-2] for column, values in columns.items()})
+    numeric_columns = COORDINATE_COLUMNS + REACTION_COLUMNS
+    df_data[numeric_columns] = df_data[numeric_columns].astype(float)
+    return df_data
+
+def load_table(file_path, file_format):
+    # Flat reaction table with the DATA_COLUMNS headers, e.g. written by convert_to_parquet.
+    # Support and coordinates may be given on the first row of each support only
+    if file_format == 'parquet':
+        df_data = pd.read_parquet(file_path)
+    else:
+        df_data = pd.read_csv(file_path)
+
+    missing = [column for column in DATA_COLUMNS if column not in df_data.columns]
+    if missing:
+        raise ValueError(f"Reaction table is missing the columns {missing}")
+
+    df_data = df_data[DATA_COLUMNS].copy()
+    first_columns = ['Support'] + COORDINATE_COLUMNS
+    df_data[first_columns] = df_data[first_columns].ffill(axis=0)
+    numeric_columns = COORDINATE_COLUMNS + REACTION_COLUMNS
+    df_data[numeric_columns] = df_data[numeric_columns].astype(float)
+    df_data['Combination'] = df_data['Combination'].astype(str)
+
+    return index_data(df_data.reset_index(drop=True))
+
+def save_table(df_data, file_path):
+    # Write the normalized frame as a flat Parquet reaction table that load_data reads back directly
+    df_data[DATA_COLUMNS[1:]].reset_index(level='Support').reset_index(drop=True).to_parquet(file_path, index=False)
+
+def convert_to_parquet(file_path, output_path=None):
+    # One-shot conversion of a TSD workbook to Parquet so repeat analyses skip the XML parsing
+    if output_path is None:
+        output_path = os.path.splitext(file_path)[0] + '.parquet'
+    save_table(load_data(file_path, streaming=True), output_path)
+    return output_path
+
+def index_data(df_data):
     df_data.set_index(['Support', df_data.groupby('Support').cumcount() + 1], inplace=True)
     df_data.index.names = ['Support', '']
 
@@ -41,493 +178,137 @@ def find_extremes(series, combinations):
 
     return max_positive, max_positive_combination, max_negative, max_negative_combination
 
-def generate_data_for_display(df_data):
-    supports = []
-    x_coordinates = []
-    y_coordinates = []
-    z_coordinates = []
-    max_pos_fx = []
-    max_pos_fx_comb = []
-    max_neg_fx = []
-    max_neg_fx_comb = []
-    max_pos_fy = []
-    max_pos_fy_comb = []
-    max_neg_fy = []
-    max_neg_fy_comb = []
-    max_pos_fz = []
-    max_pos_fz_comb = []
-    max_neg_fz = []
-    max_neg_fz_comb = []
-    max_pos_Mx = []
-    max_pos_Mx_comb = []
-    max_neg_Mx = []
-    max_neg_Mx_comb = []
-    max_pos_My = []
-    max_pos_My_comb = []
-    max_neg_My = []
-    max_neg_My_comb = []
-    max_pos_Mz = []
-    max_pos_Mz_comb = []
-    max_neg_Mz = []
-    max_neg_Mz_comb = []
-
-    unique_supports = df_data.index.get_level_values('Support').unique()
-
-    for support in unique_supports:
-        x_coord = df_data.loc[support, 'X Coordinate'].unique()[0]
-        y_coord = df_data.loc[support, 'Y Coordinate'].unique()[0]
-        z_coord = df_data.loc[support, 'Z Coordinate'].unique()[0]
-
-        max_positive_fx, max_positive_comb_fx, max_negative_fx, max_negative_comb_fx = find_extremes(df_data.loc[support]['Fx [kN]'], df_data.loc[support]['Combination'])
-        max_positive_fy, max_positive_comb_fy, max_negative_fy, max_negative_comb_fy = find_extremes(df_data.loc[support]['Fy [kN]'], df_data.loc[support]['Combination'])
-        max_positive_fz, max_positive_comb_fz, max_negative_fz, max_negative_comb_fz = find_extremes(df_data.loc[support]['Fz [kN]'], df_data.loc[support]['Combination'])
-        max_positive_Mx, max_positive_comb_Mx, max_negative_Mx, max_negative_comb_Mx = find_extremes(df_data.loc[support]['Mx [kNm]'], df_data.loc[support]['Combination'])
-        max_positive_My, max_positive_comb_My, max_negative_My, max_negative_comb_My = find_extremes(df_data.loc[support]['My [kNm]'], df_data.loc[support]['Combination'])
-        max_positive_Mz, max_positive_comb_Mz, max_negative_Mz, max_negative_comb_Mz = find_extremes(df_data.loc[support]['Mz [kNm]'], df_data.loc[support]['Combination'])
-
-        supports.append(support)
-        x_coordinates.append(x_coord)
-        y_coordinates.append(y_coord)
-        z_coordinates.append(z_coord)
-        max_pos_fx.append(max_positive_fx)
-        max_pos_fx_comb.append(max_positive_comb_fx)
-        max_neg_fx.append(max_negative_fx)
-        max_neg_fx_comb.append(max_negative_comb_fx)
-        max_pos_fy.append(max_positive_fy)
-        max_pos_fy_comb.append(max_positive_comb_fy)
-        max_neg_fy.append(max_negative_fy)
-        max_neg_fy_comb.append(max_negative_comb_fy)
-        max_pos_fz.append(max_positive_fz)
-        max_pos_fz_comb.append(max_positive_comb_fz)
-        max_neg_fz.append(max_negative_fz)
-        max_neg_fz_comb.append(max_negative_comb_fz)
-        max_pos_Mx.append(max_positive_Mx)
-        max_pos_Mx_comb.append(max_positive_comb_Mx)
-        max_neg_Mx.append(max_negative_Mx)
-        max_neg_Mx_comb.append(max_negative_comb_Mx)
-        max_pos_My.append(max_positive_My)
-        max_pos_My_comb.append(max_positive_comb_My)
-        max_neg_My.append(max_negative_My)
-        max_neg_My_comb.append(max_negative_comb_My)
-        max_pos_Mz.append(max_positive_Mz)
-        max_pos_Mz_comb.append(max_positive_comb_Mz)
-        max_neg_Mz.append(max_negative_Mz)
-        max_neg_Mz_comb.append(max_negative_comb_Mz)
-
-    new_data = {
-        'Support': supports,
-        'X Coordinate': x_coordinates,
-        'Y Coordinate': y_coordinates,
-        'Z Coordinate': z_coordinates,
-        'Max +Fx': max_pos_fx,
-        'Max +Fx Combination': max_pos_fx_comb,
-        'Max -Fx': max_neg_fx,
-        'Max -Fx Combination': max_neg_fx_comb,
-        'Max +Fy': max_pos_fy,
-        'Max +Fy Combination': max_pos_fy_comb,
-        'Max -Fy': max_neg_fy,
-        'Max -Fy Combination': max_neg_fy_comb,
-        'Max +Fz': max_pos_fz,
-        'Max +Fz Combination': max_pos_fz_comb,
-        'Max -Fz': max_neg_fz,
-        'Max -Fz Combination': max_neg_fz_comb,
-        'Max +Mx': max_pos_Mx,
-        'Max +Mx Combination': max_pos_Mx_comb,
-        'Max -Mx': max_neg_Mx,
-        'Max -Mx Combination': max_neg_Mx_comb,
-        'Max +My': max_pos_My,
-        'Max +My Combination': max_pos_My_comb,
-        'Max -My': max_neg_My,
-        'Max -My Combination': max_neg_My_comb,
-        'Max +Mz': max_pos_Mz,
-        'Max +Mz Combination': max_pos_Mz_comb,
-        'Max -Mz': max_neg_Mz,
-        'Max -Mz Combination': max_neg_Mz_comb,
-    }
+def group_reactions(df_data):
+    # Stable sort of the reaction rows by support, plus the first row of each support block
+    codes, unique_supports = pd.factorize(df_data.index.get_level_values('Support'))
+    order = np.argsort(codes, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0]) if len(order) else np.array([], dtype=int)
+    return unique_supports, order, starts
+
+
+def envelope_rows(values, order, starts):
+    # Row positions of the max positive and max negative value of every column of
+    # `values` for every support, -1 where no value of that sign exists
+    n_rows = len(order)
+    sorted_values = values[order]
+    group_sizes = np.diff(np.r_[starts, n_rows])
+    row_positions = np.arange(n_rows)[:, None]
+
+    extremes = []
+    for mask, fill, reduce_extreme in ((sorted_values > 0, -np.inf, np.maximum),
+                                       (sorted_values < 0, np.inf, np.minimum)):
+        signed = np.where(mask, sorted_values, fill)
+        extreme = reduce_extreme.reduceat(signed, starts, axis=0)
+        hits = np.where(mask & (signed == np.repeat(extreme, group_sizes, axis=0)), row_positions, n_rows)
+        first_hit = np.minimum.reduceat(hits, starts, axis=0)
+        extremes.append(np.where(first_hit < n_rows, order[np.minimum(first_hit, n_rows - 1)], -1))
+
+    return extremes[0], extremes[1]
+
+
+def concurrent_columns(component, sign):
+    return [f'Max {sign}{component} Concurrent {other}' for other in COMPONENTS]
+
+def gather_concurrent(values, rows):
+    # Full reaction vectors of the governing rows as one bulk gather, NaN where no row governs
+    concurrent = values[rows]
+    concurrent[rows < 0] = np.nan
+    return concurrent
+
+def generate_data_for_display(df_data, concurrent=False):
+    unique_supports, order, starts = group_reactions(df_data)
+    first_rows = order[starts]
+
+    new_data = {'Support': np.asarray(unique_supports)}
+    for column in COORDINATE_COLUMNS:
+        new_data[column] = df_data[column].to_numpy()[first_rows]
+
+    values = df_data[REACTION_COLUMNS].to_numpy(dtype=float)
+    combinations = df_data['Combination'].to_numpy(dtype=object)
+    positive_rows, negative_rows = envelope_rows(values, order, starts)
+
+    # Supports without a value of the given sign keep the 0 / "-" conventions of find_extremes
+    for i, component in enumerate(COMPONENTS):
+        for sign, rows in (('+', positive_rows[:, i]), ('-', negative_rows[:, i])):
+            found = rows >= 0
+            new_data[f'Max {sign}{component}'] = np.where(found, values[rows, i], 0.0)
+            new_data[f'Max {sign}{component} Combination'] = np.where(found, combinations[rows], '-')
+
+    # Optionally add the concurrent Fx..Mz at the combination governing each extreme
+    if concurrent:
+        for i, component in enumerate(COMPONENTS):
+            for sign, rows in (('+', positive_rows[:, i]), ('-', negative_rows[:, i])):
+                vectors = gather_concurrent(values, rows)
+                for column, vector in zip(concurrent_columns(component, sign), vectors.T):
+                    new_data[column] = vector
 
     new_df = pd.DataFrame(new_data)
     return new_df
 
+def generate_concurrent_reactions(df_data):
+    # One row per support and governing extreme ('Max +Fz', ...) with the full concurrent
+    # reaction vector of its governing combination
+    unique_supports, order, starts = group_reactions(df_data)
+    values = df_data[REACTION_COLUMNS].to_numpy(dtype=float)
+    combinations = df_data['Combination'].to_numpy(dtype=object)
+    positive_rows, negative_rows = envelope_rows(values, order, starts)
+
+    # Rows ordered support by support, then extreme by extreme
+    envelopes = [f'Max {sign}{component}' for component in COMPONENTS for sign in ('+', '-')]
+    rows = np.stack([positive_rows, negative_rows], axis=2).reshape(len(unique_supports), -1).ravel()
+
+    concurrent = pd.DataFrame({
+        'Support': np.repeat(np.asarray(unique_supports), len(envelopes)),
+        'Envelope': np.tile(envelopes, len(unique_supports)),
+        'Combination': np.where(rows >= 0, combinations[rows], '-'),
+    })
+    for column, vector in zip(REACTION_COLUMNS, gather_concurrent(values, rows).T):
+        concurrent[column] = vector
+
+    return concurrent
+
+def concurrent_reactions_from_display(new_df, components=COMPONENTS):
+    # The generate_concurrent_reactions rows of `components`, read from the concurrent columns of a
+    # generate_data_for_display(..., concurrent=True) table instead of regrouping the reaction rows
+    envelopes = [(component, sign) for component in components for sign in ('+', '-')]
+    supports = new_df['Support'].to_numpy()
+    combinations = np.stack([new_df[f'Max {sign}{component} Combination'].to_numpy(dtype=object)
+                             for component, sign in envelopes], axis=1)
+    # Shape (supports, envelopes, 6)
+    vectors = np.stack([new_df[concurrent_columns(component, sign)].to_numpy(dtype=float)
+                        for component, sign in envelopes], axis=1)
+
+    concurrent = pd.DataFrame({
+        'Support': np.repeat(supports, len(envelopes)),
+        'Envelope': np.tile([f'Max {sign}{component}' for component, sign in envelopes], len(supports)),
+        'Combination': combinations.ravel(),
+    })
+    for i, column in enumerate(REACTION_COLUMNS):
+        concurrent[column] = vectors[:, :, i].ravel()
+
+    return concurrent
+
 def calculate_piles(safe_capacity, max_load):
     if safe_capacity <= 0:
         return 0
     return -(-max_load // safe_capacity)  # Ceiling division
 
-def generate_plot(option, new_df, safe_pile_capacity=None, safe_pile_tensile_capacity=None):
-    fig = go.Figure()
-
-    if safe_pile_capacity is not None:
-        safe_pile_capacity = float(safe_pile_capacity)
-        if not (100 < safe_pile_capacity <= 10000):
-            raise ValueError("Pile capacity is too low or too high")
+def calculate_required_piles(new_df, safe_pile_capacity, safe_pile_tensile_capacity=None):
+    max_loads = new_df[['Max +Fz', 'Max -Fz']].max(axis=1)  # Taking maximum values
+    max_loads = max_loads.clip(lower=0)  # Setting negative values to 0
+    required_piles = pd.Series(calculate_piles(safe_pile_capacity, max_loads), index=new_df.index)
 
+    # Uplift governed supports need enough piles to resist the largest tension
     if safe_pile_tensile_capacity is not None:
-        try:
-            safe_pile_tensile_capacity = float(safe_pile_tensile_capacity)
-            if safe_pile_tensile_capacity >= 0:
-                raise ValueError("Please enter a negative value for tensile capacity")
-        except ValueError:
-            raise ValueError("Invalid input for tensile capacity")
-    else:
-        safe_pile_tensile_capacity = None
-
-    if option == 'Coordinates':
-        unique_z_levels = new_df['Z Coordinate'].unique()
-        fig = go.Figure()
-
-        for z in unique_z_levels:
-            df_z = new_df[new_df['Z Coordinate'] == z]
-            trace = go.Scatter(
-                x=df_z['X Coordinate'],
-                y=df_z['Y Coordinate'],
-                mode='markers+text',
-                marker=dict(size=10),
-                text=df_z['Support'],
-                name=f'Z = {z}'
-            )
-            fig.add_trace(trace)
-
-        fig.update_layout(
-            title='Support Coordinates',
-            xaxis_title='X Coordinate',
-            yaxis_title='Y Coordinate',
-        )
-
-    elif option == 'Maximum Fx':
-        max_primary = new_df[f'Max +{option.split()[-1]}']
-        max_secondary = new_df[f'Max -{option.split()[-1]}']
-
-        fig = make_subplots(rows=2, cols=1)
-
-        hovertext01 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max +Fx: {row["Max +Fx"]} kN<br>Combination +Fx: {row["Max +Fx Combination"]}', axis=1)
-        hovertext02 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max -Fx: {row["Max -Fx"]} kN<br>Combination -Fx: {row["Max -Fx Combination"]}', axis=1)
-        fig.add_trace(go.Bar(
-            x=new_df['Support'],
-            y=max_primary,
-            name=f'Maximum +{option.split()[-1]}',
-            text=hovertext01,
-            hoverinfo='text'
-        ), row= 1, col= 1)
-        fig.add_trace(go.Bar(
-            x=new_df['Support'],
-            y=max_secondary,
-            name=f'Maximum -{option.split()[-1]}',
-            text=hovertext02,
-            hoverinfo='text'
-        ), row=1, col=1)
-
-        scatter_color = 'blue' # Adjust scatter color based on option
-        hovertext03 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max +Fx: {row["Max +Fx"]} kN<br>Max -Fx: {row["Max -Fx"]} kN<br>Combination +Fx: {row["Max +Fx Combination"]}<br>Combination -Fx: {row["Max -Fx Combination"]}', axis=1)
-
-        fig.add_trace(go.Scatter(
-            x=new_df['X Coordinate'],
-            y=new_df["Y Coordinate"],
-            mode='markers',
-            marker=dict(color=scatter_color),
-            name="Max [+/-] Fx",
-            text=hovertext03,
-            hoverinfo='text'
-        ), row=2, col=1)
-
-        fig.update_layout(
-        title='Maximum Fx and Support Coordinates',
-        autosize=False,
-        width=1300,
-        height=900 
-        
-        )
-
-        fig.update_yaxes(automargin=True)
-
-    elif option == 'Maximum Fy':
-
-        max_primary = new_df[f'Max +{option.split()[-1]}']
-        max_secondary = new_df[f'Max -{option.split()[-1]}']
-
-        fig = make_subplots(rows=2, cols=1)
-
-        hovertext01 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max +Fy: {row["Max +Fy"]} kN<br>Combination +Fy: {row["Max +Fy Combination"]}', axis=1)
-        hovertext02 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max -Fy: {row["Max -Fy"]} kN<br>Combination -Fy: {row["Max -Fy Combination"]}', axis=1)
-        fig.add_trace(go.Bar(
-            x=new_df['Support'],
-            y=max_primary,
-            name=f'Maximum +{option.split()[-1]}',
-            text=hovertext01,
-            hoverinfo='text'
-        ), row= 1, col= 1)
-        fig.add_trace(go.Bar(
-            x=new_df['Support'],
-            y=max_secondary,
-            name=f'Maximum -{option.split()[-1]}',
-            text=hovertext02,
-            hoverinfo='text'
-        ), row=1, col=1)
-
-        scatter_color = 'blue' # Adjust scatter color based on option
-        hovertext03 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max +Fy: {row["Max +Fy"]} kN<br>Max -Fy: {row["Max -Fy"]} kN<br>Combination +Fy: {row["Max +Fy Combination"]}<br>Combination -Fy: {row["Max -Fy Combination"]}', axis=1)
-
-        fig.add_trace(go.Scatter(
-            x=new_df['X Coordinate'],
-            y=new_df["Y Coordinate"],
-            mode='markers',
-            marker=dict(color=scatter_color),
-            name="Max [+/-] Fy",
-            text=hovertext03,
-            hoverinfo='text'
-        ), row=2, col=1)
-
-        fig.update_layout(
-        title='Maximum Fy and Support Coordinates',
-        autosize=False,
-        width=1300,
-        height=900 
-        
-        )
-
-        fig.update_yaxes(automargin=True)
-
-    elif option == 'Maximum Fz':
-
-        max_primary = new_df[f'Max +{option.split()[-1]}']
-        max_secondary = new_df[f'Max -{option.split()[-1]}']
-
-        fig = make_subplots(rows=2, cols=1)
-
-        hovertext01 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max +Fz: {row["Max +Fz"]} kN<br>Combination +Fz: {row["Max +Fz Combination"]}', axis=1)
-        hovertext02 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max -Fz: {row["Max -Fz"]} kN<br>Combination -Fz: {row["Max -Fz Combination"]}', axis=1)
-        fig.add_trace(go.Bar(
-            x=new_df['Support'],
-            y=max_primary,
-            name=f'Maximum +{option.split()[-1]}',
-            text=hovertext01,
-            hoverinfo='text'
-        ), row= 1, col= 1)
-        fig.add_trace(go.Bar(
-            x=new_df['Support'],
-            y=max_secondary,
-            name=f'Maximum -{option.split()[-1]}',
-            text=hovertext02,
-            hoverinfo='text'
-        ), row=1, col=1)
-
-        scatter_color = 'blue' # Adjust scatter color based on option
-        hovertext03 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max +Fz: {row["Max +Fz"]} kN<br>Max -Fz: {row["Max -Fz"]} kN<br>Combination +Fz: {row["Max +Fz Combination"]}<br>Combination -Fz: {row["Max -Fz Combination"]}', axis=1)
-
-        fig.add_trace(go.Scatter(
-            x=new_df['X Coordinate'],
-            y=new_df["Y Coordinate"],
-            mode='markers',
-            marker=dict(color=scatter_color),
-            name="Max [+/-] Fz",
-            text=hovertext03,
-            hoverinfo='text'
-        ), row=2, col=1)
-
-        fig.update_layout(
-        title='Maximum Fz and Support Coordinates',
-        autosize=False,
-        width=1300,
-        height=900 
-        
-        )
-
-        fig.update_yaxes(automargin=True)
-    
-
-    elif option == 'Maximum Mx':
-
-        max_primary = new_df[f'Max +{option.split()[-1]}']
-        max_secondary = new_df[f'Max -{option.split()[-1]}']
-
-        fig = make_subplots(rows=2, cols=1)
-
-        hovertext01 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max +Mx: {row["Max +Mx"]} kN<br>Combination +Mx: {row["Max +Mx Combination"]}', axis=1)
-        hovertext02 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max -Mx: {row["Max -Mx"]} kN<br>Combination -Mx: {row["Max -Mx Combination"]}', axis=1)
-        fig.add_trace(go.Bar(
-            x=new_df['Support'],
-            y=max_primary,
-            name=f'Maximum +{option.split()[-1]}',
-            text=hovertext01,
-            hoverinfo='text'
-        ), row= 1, col= 1)
-        fig.add_trace(go.Bar(
-            x=new_df['Support'],
-            y=max_secondary,
-            name=f'Maximum -{option.split()[-1]}',
-            text=hovertext02,
-            hoverinfo='text'
-        ), row=1, col=1)
-
-        scatter_color = 'blue' # Adjust scatter color based on option
-        hovertext03 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max +Mx: {row["Max +Mx"]} kN<br>Max -Mx: {row["Max -Mx"]} kN<br>Combination +Mx: {row["Max +Mx Combination"]}<br>Combination -Mx: {row["Max -Mx Combination"]}', axis=1)
-
-        fig.add_trace(go.Scatter(
-            x=new_df['X Coordinate'],
-            y=new_df["Y Coordinate"],
-            mode='markers',
-            marker=dict(color=scatter_color),
-            name="Max [+/-] Mx",
-            text=hovertext03,
-            hoverinfo='text'
-        ), row=2, col=1)
-
-        fig.update_layout(
-        title='Maximum Mx and Support Coordinates',
-        autosize=False,
-        width=1300,
-        height=900 
-        
-        )
-
-        fig.update_yaxes(automargin=True)
-        
-    elif option == 'Maximum My':
-
-        max_primary = new_df[f'Max +{option.split()[-1]}']
-        max_secondary = new_df[f'Max -{option.split()[-1]}']
-
-        fig = make_subplots(rows=2, cols=1)
-
-        hovertext01 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max +My: {row["Max +My"]} kN<br>Combination +My: {row["Max +My Combination"]}', axis=1)
-        hovertext02 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max -My: {row["Max -My"]} kN<br>Combination -My: {row["Max -My Combination"]}', axis=1)
-        fig.add_trace(go.Bar(
-            x=new_df['Support'],
-            y=max_primary,
-            name=f'Maximum +{option.split()[-1]}',
-            text=hovertext01,
-            hoverinfo='text'
-        ), row= 1, col= 1)
-        fig.add_trace(go.Bar(
-            x=new_df['Support'],
-            y=max_secondary,
-            name=f'Maximum -{option.split()[-1]}',
-            text=hovertext02,
-            hoverinfo='text'
-        ), row=1, col=1)
-
-        scatter_color = 'blue' # Adjust scatter color based on option
-        hovertext03 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max +My: {row["Max +My"]} kN<br>Max -My: {row["Max -My"]} kN<br>Combination +My: {row["Max +My Combination"]}<br>Combination -My: {row["Max -My Combination"]}', axis=1)
-
-        fig.add_trace(go.Scatter(
-            x=new_df['X Coordinate'],
-            y=new_df["Y Coordinate"],
-            mode='markers',
-            marker=dict(color=scatter_color),
-            name="Max [+/-] My",
-            text=hovertext03,
-            hoverinfo='text'
-        ), row=2, col=1)
-
-        fig.update_layout(
-        title='Maximum My and Support Coordinates',
-        autosize=False,
-        width=1300,
-        height=900 
-        
-        )
-
-        fig.update_yaxes(automargin=True)
-        
-
-    elif option == 'Maximum Mz':
-
-        max_primary = new_df[f'Max +{option.split()[-1]}']
-        max_secondary = new_df[f'Max -{option.split()[-1]}']
-
-        fig = make_subplots(rows=2, cols=1)
-
-        hovertext01 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max +Mz: {row["Max +Mz"]} kN<br>Combination +Mz: {row["Max +Mz Combination"]}', axis=1)
-        hovertext02 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max -Mz: {row["Max -Mz"]} kN<br>Combination -Mz: {row["Max -Mz Combination"]}', axis=1)
-        fig.add_trace(go.Bar(
-            x=new_df['Support'],
-            y=max_primary,
-            name=f'Maximum +{option.split()[-1]}',
-            text=hovertext01,
-            hoverinfo='text'
-        ), row= 1, col= 1)
-        fig.add_trace(go.Bar(
-            x=new_df['Support'],
-            y=max_secondary,
-            name=f'Maximum -{option.split()[-1]}',
-            text=hovertext02,
-            hoverinfo='text'
-        ), row=1, col=1)
-
-        scatter_color = 'blue' # Adjust scatter color based on option
-        hovertext03 = new_df.apply(lambda row: f'Support: {row["Support"]}<br>Max +Mz: {row["Max +Mz"]} kN<br>Max -Mz: {row["Max -Mz"]} kN<br>Combination +Mz: {row["Max +Mz Combination"]}<br>Combination -Mz: {row["Max -Mz Combination"]}', axis=1)
-
-        fig.add_trace(go.Scatter(
-            x=new_df['X Coordinate'],
-            y=new_df["Y Coordinate"],
-            mode='markers',
-            marker=dict(color=scatter_color),
-            name="Max [+/-] Mz",
-            text=hovertext03,
-            hoverinfo='text'
-        ), row=2, col=1)
-
-        fig.update_layout(
-        title='Maximum Mz and Support Coordinates',
-        autosize=False,
-        width=1300,
-        height=900 
-        
-        )
-
-        fig.update_yaxes(automargin=True)
-        
-
-    elif option == 'Number of Piles':
-        if safe_pile_capacity is None:
-            raise ValueError("Safe pile capacity must be provided for 'Number of Piles' option")
-
-        # Calculate required piles
-        max_loads = new_df[['Max +Fz', 'Max -Fz']].max(axis=1)  # Taking maximum values
-        max_loads[max_loads < 0] = 0  # Setting negative values to 0
-        required_piles = max_loads.apply(lambda x: calculate_piles(safe_pile_capacity, x))
-
-        # Define color mapping based on number of piles
-        color_map = {
-            1: 'blue',
-            2: 'red',
-            3: 'green',
-            4: "black",
-            5: "orange",
-            6: "brown",
-            7: "yellow",
-            8: "pink"
-    
-        }
-
-        traces = []
-        for pile_number, color in color_map.items():
-            df_pile = new_df[required_piles == pile_number]
-            trace = go.Scatter(
-                x=df_pile['X Coordinate'],
-                y=df_pile['Y Coordinate'],
-                mode='markers',
-                marker=dict(
-                    size=12,
-                    color=color,
-                    line=dict(width=1, color='DarkSlateGrey')
-                ),
-                name=f'{pile_number} Piles'
-            )
-            traces.append(trace)
-
-        for trace in traces:
-            fig.add_trace(trace)
-
-        fig.update_layout(
-            title='Number of Piles required for each Support',
-            xaxis_title='X Coordinate',
-            yaxis_title='Y Coordinate',
-            hovermode='closest'
-        )
-
+        max_uplift = (-new_df['Max -Fz']).clip(lower=0)
+        uplift_piles = pd.Series(calculate_piles(abs(safe_pile_tensile_capacity), max_uplift), index=new_df.index)
+        required_piles = np.maximum(required_piles, uplift_piles)
 
-    else:
-        raise ValueError(f"Invalid option {option}.")
+    return required_piles
 
 
-    return fig
\ No newline at end of file
+def __getattr__(name):
+    if name in PLOT_NAMES:
+        import plots
+        return getattr(plots, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,76 @@
+import io
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import diagnostics
+from cache import load_cached, read_bytes
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='parse')
+
+
+class ParseCancelled(Exception):
+    pass
+
+
+@dataclass
+class ParseJob:
+    # A background load_data + generate_data_for_display run for one file
+    key: str
+    future: Future = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    rows: int = 0
+    supports: int = 0
+    total_rows: int = None
+    # Diagnostics of the worker thread, collected when the job was started with diagnostics enabled
+    diagnostics: bool = False
+    trace_memory: bool = False
+    records: list = field(default_factory=list)
+
+    def check(self):
+        # Cancellation takes effect between stages and at the streaming loader's progress callbacks
+        if self.cancel_event.is_set():
+            raise ParseCancelled(self.key)
+
+    def report(self, rows, supports, total_rows):
+        # Progress callback of the streaming loader
+        self.check()
+        self.rows, self.supports, self.total_rows = rows, supports, total_rows
+
+    @property
+    def fraction(self):
+        if not self.total_rows:
+            return None
+        return min(self.rows / self.total_rows, 1.0)
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.future.cancel()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        return self.future.result()
+
+
+def run(job, file_path):
+    # Diagnostics records are per thread, so the worker collects its own and hands them to the job
+    if job.diagnostics:
+        diagnostics.enable(trace_memory=job.trace_memory)
+    try:
+        job.check()
+        return load_cached(file_path, streaming=True, key=job.key, progress=job.report, checkpoint=job.check)
+    finally:
+        job.records = diagnostics.records()
+        diagnostics.disable()
+
+
+def start_parse(file_path, key):
+    # Uploads are copied so the worker never shares a file position with the script thread
+    if not isinstance(file_path, str):
+        file_path = io.BytesIO(read_bytes(file_path))
+
+    job = ParseJob(key=key, diagnostics=diagnostics.is_enabled(), trace_memory=diagnostics.traces_memory())
+    job.future = _executor.submit(run, job, file_path)
+    return job
@@ -0,0 +1,154 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from functions import COORDINATE_COLUMNS
+
+PILE_CHECK_COLUMNS = ['Support'] + COORDINATE_COLUMNS + [
+    'Number of Piles',
+    'Compression Piles', 'Max Compression', 'Compression Combination', 'Compression Utilisation',
+    'Uplift Piles', 'Max Uplift', 'Uplift Combination', 'Tension Utilisation',
+    'Governing Check',
+]
+
+
+def ceil_divide(load, capacity):
+    return np.ceil(load / capacity) if capacity > 0 else np.zeros_like(load)
+
+
+def check_piles(store, safe_pile_capacity, safe_pile_tensile_capacity=None, mask=None):
+    # Pile check over every support and combination of a ReactionStore at once.
+    # Fz > 0 is compression, Fz < 0 is uplift resisted by the tensile capacity (a negative value)
+    safe_pile_capacity = float(safe_pile_capacity)
+    if safe_pile_capacity <= 0:
+        raise ValueError("Pile capacity must be positive")
+    if safe_pile_tensile_capacity is not None:
+        safe_pile_tensile_capacity = float(safe_pile_tensile_capacity)
+        if safe_pile_tensile_capacity >= 0:
+            raise ValueError("Please enter a negative value for tensile capacity")
+
+    fz = np.nan_to_num(store.component('Fz'))
+    if mask is not None:
+        # Only the selected combinations, e.g. from a CombinationIndex
+        fz = np.where(np.asarray(mask, dtype=bool)[None, :], fz, 0.0)
+    compression = np.clip(fz, 0, None)
+    uplift = np.clip(-fz, 0, None)
+    supports = np.arange(fz.shape[0])
+
+    compression_rows = compression.argmax(axis=1)
+    uplift_rows = uplift.argmax(axis=1)
+    max_compression = compression[supports, compression_rows]
+    max_uplift = uplift[supports, uplift_rows]
+
+    compression_piles = ceil_divide(max_compression, safe_pile_capacity)
+    if safe_pile_tensile_capacity is None:
+        uplift_piles = np.zeros_like(max_uplift)
+    else:
+        uplift_piles = ceil_divide(max_uplift, -safe_pile_tensile_capacity)
+    piles = np.maximum(compression_piles, uplift_piles)
+
+    # Utilisation of the chosen pile count, infinite where a load has no piles to resist it
+    with np.errstate(divide='ignore', invalid='ignore'):
+        compression_utilisation = np.where(max_compression > 0, max_compression / (piles * safe_pile_capacity), 0.0)
+        if safe_pile_tensile_capacity is None:
+            tension_utilisation = np.full_like(max_uplift, np.nan)
+        else:
+            tension_utilisation = np.where(max_uplift > 0, max_uplift / (piles * -safe_pile_tensile_capacity), 0.0)
+
+    governing = np.where(uplift_piles > compression_piles, 'Uplift', 'Compression')
+    governing = np.where(piles == 0, '-', governing)
+    if safe_pile_tensile_capacity is None:
+        governing = np.where(max_uplift > 0, np.char.add(governing.astype(str), ' (uplift not checked)'), governing)
+
+    check = pd.DataFrame({
+        'Support': store.supports,
+        'X Coordinate': store.coordinates[:, 0],
+        'Y Coordinate': store.coordinates[:, 1],
+        'Z Coordinate': store.coordinates[:, 2],
+        'Number of Piles': piles.astype(int),
+        'Compression Piles': compression_piles.astype(int),
+        'Max Compression': max_compression,
+        'Compression Combination': np.where(max_compression > 0, store.combinations[compression_rows], '-'),
+        'Compression Utilisation': compression_utilisation,
+        'Uplift Piles': uplift_piles.astype(int),
+        'Max Uplift': max_uplift,
+        'Uplift Combination': np.where(max_uplift > 0, store.combinations[uplift_rows], '-'),
+        'Tension Utilisation': tension_utilisation,
+        'Governing Check': governing,
+    })
+    return check[PILE_CHECK_COLUMNS]
+
+
+@dataclass
+class LoadIndex:
+    # Governing compression per support sorted ascending, for capacity what-if queries
+    supports: np.ndarray
+    loads: np.ndarray
+    order: np.ndarray
+    # Minimum pile count per support from uplift, fixed for a given tensile capacity
+    uplift_piles: np.ndarray
+
+    def pile_counts(self, safe_pile_capacity):
+        compression_piles = np.zeros(len(self.loads))
+        compression_piles[self.order] = ceil_divide(self.loads, float(safe_pile_capacity))
+        return np.maximum(compression_piles, self.uplift_piles).astype(int)
+
+    def histogram(self, capacities):
+        # Number of supports per pile count (columns) for every capacity (rows). Supports in
+        # class n have a load in ((n - 1) * capacity, n * capacity], found by binary search
+        capacities = np.atleast_1d(np.asarray(capacities, dtype=float))
+        if (capacities <= 0).any():
+            raise ValueError("Pile capacity must be positive")
+
+        max_load = self.loads[-1] if len(self.loads) else 0.0
+        max_piles = int(max(np.ceil(max_load / capacities.min()), self.uplift_piles.max(initial=0)))
+        pile_numbers = np.arange(max_piles + 1)
+        counts = np.zeros((len(capacities), max_piles + 1), dtype=np.int64)
+
+        for floor in np.unique(self.uplift_piles).astype(int):
+            loads = self.loads[self.uplift_piles[self.order] == floor]
+            at_most = np.searchsorted(loads, capacities[:, None] * pile_numbers[None, :], side='right')
+            in_class = np.diff(at_most, axis=1, prepend=0)
+            # Supports below the uplift floor are lifted into it
+            in_class[:, floor] = at_most[:, floor]
+            in_class[:, :floor] = 0
+            counts += in_class
+
+        histogram = pd.DataFrame(counts, index=pd.Index(capacities, name='Capacity'), columns=pile_numbers)
+        histogram.columns.name = 'Number of Piles'
+        return histogram
+
+    def total_piles(self, capacities):
+        histogram = self.histogram(capacities)
+        return pd.Series(histogram.to_numpy() @ histogram.columns.to_numpy(), index=histogram.index, name='Total Piles')
+
+    def changed_supports(self, from_capacity, to_capacity):
+        before = self.pile_counts(from_capacity)
+        after = self.pile_counts(to_capacity)
+        changed = before != after
+        return pd.DataFrame({
+            'Support': self.supports[changed],
+            'Piles Before': before[changed],
+            'Piles After': after[changed],
+        })
+
+
+def build_load_index(new_df, safe_pile_tensile_capacity=None):
+    loads = new_df[['Max +Fz', 'Max -Fz']].max(axis=1).clip(lower=0).to_numpy(dtype=float)
+    order = np.argsort(loads, kind='stable')
+
+    if safe_pile_tensile_capacity is None:
+        uplift_piles = np.zeros(len(loads))
+    else:
+        safe_pile_tensile_capacity = float(safe_pile_tensile_capacity)
+        if safe_pile_tensile_capacity >= 0:
+            raise ValueError("Please enter a negative value for tensile capacity")
+        uplift_piles = ceil_divide((-new_df['Max -Fz']).clip(lower=0).to_numpy(dtype=float), -safe_pile_tensile_capacity)
+
+    return LoadIndex(
+        supports=new_df['Support'].to_numpy(dtype=object),
+        loads=loads[order],
+        order=order,
+        uplift_piles=uplift_piles,
+    )
@@ -0,0 +1,226 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from functions import COORDINATE_COLUMNS
+from pile_check import ceil_divide
+
+# Pile counts of the standard layouts, tried smallest first
+LAYOUT_COUNTS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 12, 15, 16, 20, 25]
+DEFAULT_SPACING = 1.8
+
+# Elements of the (supports, combinations, piles) load array evaluated at once
+CHUNK_ELEMENTS = 4_000_000
+
+# Moments up to this value [kNm] are treated as zero, e.g. at pinned supports
+MOMENT_TOLERANCE = 0.01
+
+PILE_GROUP_COLUMNS = ['Support'] + COORDINATE_COLUMNS + [
+    'Number of Piles', 'Layout', 'Axial Only Piles',
+    'Max Pile Load', 'Max Pile Combination', 'Compression Utilisation',
+    'Min Pile Load', 'Min Pile Combination', 'Tension Utilisation',
+    'Governing Combination', 'Governing Check',
+]
+
+
+@dataclass
+class PileLayout:
+    name: str
+    # Pile X/Y offsets from the pile cap centroid [m], shape (piles, 2)
+    offsets: np.ndarray
+
+    @property
+    def piles(self):
+        return len(self.offsets)
+
+    def lever_arms(self):
+        # Whether the group can carry Mx (piles off the X axis) and My (piles off the Y axis);
+        # one pile carries neither, a line of piles only the moment about the line's normal
+        x, y = self.offsets[:, 0], self.offsets[:, 1]
+        return bool((y ** 2).sum() > 0), bool((x ** 2).sum() > 0)
+
+    def coefficients(self):
+        # Pile load per unit Mx and My: y / sum(y^2) and x / sum(x^2), zero about an axis without
+        # lever arm (see lever_arms)
+        x, y = self.offsets[:, 0], self.offsets[:, 1]
+        sum_x2, sum_y2 = (x ** 2).sum(), (y ** 2).sum()
+        mx = y / sum_y2 if sum_y2 > 0 else np.zeros_like(y)
+        my = x / sum_x2 if sum_x2 > 0 else np.zeros_like(x)
+        return mx, my
+
+    def extreme_coefficients(self):
+        # The load of pile i is linear in (Mx, My) with coefficients (mx_i, my_i), so the highest and
+        # lowest loaded piles of any combination are corners of the convex hull of these points
+        mx, my = self.coefficients()
+        corners = convex_hull(np.column_stack([mx, my]))
+        return corners[:, 0], corners[:, 1]
+
+
+def convex_hull(points):
+    # Corners of the convex hull of 2D points (monotone chain), a single point for coincident points
+    points = np.unique(points.round(12), axis=0)
+    if len(points) <= 2:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for point in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], point) <= 0:
+            lower.pop()
+        lower.append(point)
+    for point in points[::-1]:
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], point) <= 0:
+            upper.pop()
+        upper.append(point)
+    return np.array(lower[:-1] + upper[:-1])
+
+
+def grid_offsets(rows, columns, spacing):
+    x = (np.arange(columns) - (columns - 1) / 2) * spacing
+    y = (np.arange(rows) - (rows - 1) / 2) * spacing
+    return np.array([(xi, yi) for yi in y for xi in x], dtype=float)
+
+
+def ring_offsets(piles, radius, centre=False):
+    angles = np.pi / 2 + 2 * np.pi * np.arange(piles) / piles
+    offsets = np.column_stack([radius * np.cos(angles), radius * np.sin(angles)])
+    if centre:
+        offsets = np.vstack([[0.0, 0.0], offsets])
+    return offsets
+
+
+def standard_layout(piles, spacing=DEFAULT_SPACING):
+    # Usual pile cap arrangements with at least `spacing` between neighbouring piles
+    s = spacing
+    if piles == 1:
+        return PileLayout('Single pile', np.zeros((1, 2)))
+    if piles == 2:
+        return PileLayout('2 in line', grid_offsets(1, 2, s))
+    if piles == 3:
+        return PileLayout('Triangle', ring_offsets(3, s / np.sqrt(3)))
+    if piles == 4:
+        return PileLayout('2 x 2', grid_offsets(2, 2, s))
+    if piles == 5:
+        return PileLayout('2 x 2 + centre', np.vstack([[0.0, 0.0], grid_offsets(2, 2, s * np.sqrt(2))]))
+    if piles == 6:
+        return PileLayout('2 x 3', grid_offsets(2, 3, s))
+    if piles == 7:
+        return PileLayout('Hexagon + centre', ring_offsets(6, s, centre=True))
+    if piles == 8:
+        return PileLayout('3 x 3 ring', np.delete(grid_offsets(3, 3, s), 4, axis=0))
+    # Larger groups are the squarest rectangular grid
+    rows = max(r for r in range(1, int(np.sqrt(piles)) + 1) if piles % r == 0)
+    return PileLayout(f'{rows} x {piles // rows}', grid_offsets(rows, piles // rows, s))
+
+
+def standard_layouts(spacing=DEFAULT_SPACING, counts=LAYOUT_COUNTS):
+    return [standard_layout(piles, spacing) for piles in counts]
+
+
+def design_pile_groups(store, safe_pile_capacity, safe_pile_tensile_capacity=None, spacing=DEFAULT_SPACING,
+                       layouts=None, mask=None, chunk_elements=CHUNK_ELEMENTS):
+    # Smallest layout per support in which no pile of any combination exceeds the compression capacity
+    # or, when given, the tensile capacity (a negative value). Pile loads are
+    # P / n + Mx * y / sum(y^2) + My * x / sum(x^2) with P = Fz, evaluated for every support,
+    # combination and corner pile of every layout, a chunk of supports at a time. A layout without
+    # lever arm about an axis fails at supports with a moment about that axis above MOMENT_TOLERANCE
+    safe_pile_capacity = float(safe_pile_capacity)
+    if safe_pile_capacity <= 0:
+        raise ValueError("Pile capacity must be positive")
+    if safe_pile_tensile_capacity is not None:
+        safe_pile_tensile_capacity = float(safe_pile_tensile_capacity)
+        if safe_pile_tensile_capacity >= 0:
+            raise ValueError("Please enter a negative value for tensile capacity")
+    layouts = sorted(layouts or standard_layouts(spacing), key=lambda layout: layout.piles)
+
+    # The corner piles of all layouts side by side, layout k owning rows bounds[k]:bounds[k + 1]
+    corners = [layout.extreme_coefficients() for layout in layouts]
+    mx, my = (np.concatenate(values) for values in zip(*corners))
+    bounds = np.cumsum([0] + [len(corner_mx) for corner_mx, _ in corners])
+    axial = np.array([1.0 / layout.piles for layout in layouts])[:, None]
+    carries_mx, carries_my = np.array([layout.lever_arms() for layout in layouts]).T
+
+    combinations = np.arange(len(store.combinations))
+    if mask is not None:
+        combinations = combinations[np.asarray(mask, dtype=bool)]
+
+    supports = len(store.supports)
+    shape = (supports, len(layouts))
+    max_load, min_load = np.empty(shape), np.empty(shape)
+    max_rows, min_rows = np.empty(shape, dtype=np.int64), np.empty(shape, dtype=np.int64)
+    max_mx, max_my = np.zeros(supports), np.zeros(supports)
+
+    chunk = max(1, chunk_elements // max(1, len(combinations) * len(mx)))
+    for start in range(0, supports, chunk):
+        stop = min(start + chunk, supports)
+        # Missing rows carry no load. Loads are laid out (piles, supports x combinations) so the
+        # reductions over the piles of each layout run over a few contiguous rows
+        fz, moment_x, moment_y = (np.nan_to_num(store.reactions[start:stop, combinations, i]).ravel() for i in (2, 3, 4))
+        max_mx[start:stop] = np.abs(moment_x).reshape(stop - start, -1).max(axis=1, initial=0)
+        max_my[start:stop] = np.abs(moment_y).reshape(stop - start, -1).max(axis=1, initial=0)
+        moments = mx[:, None] * moment_x + my[:, None] * moment_y
+        highest = np.empty((len(layouts), len(fz)))
+        lowest = np.empty((len(layouts), len(fz)))
+        for k in range(len(layouts)):
+            np.max(moments[bounds[k]:bounds[k + 1]], axis=0, out=highest[k])
+            np.min(moments[bounds[k]:bounds[k + 1]], axis=0, out=lowest[k])
+        highest += axial * fz
+        lowest += axial * fz
+
+        # Governing combination of each layout and support
+        shape_chunk = (len(layouts), stop - start, len(combinations))
+        highest, lowest = highest.reshape(shape_chunk), lowest.reshape(shape_chunk)
+        max_rows[start:stop] = highest.argmax(axis=2).T
+        min_rows[start:stop] = lowest.argmin(axis=2).T
+        max_load[start:stop] = np.take_along_axis(highest, max_rows[start:stop].T[:, :, None], axis=2)[:, :, 0].T
+        min_load[start:stop] = np.take_along_axis(lowest, min_rows[start:stop].T[:, :, None], axis=2)[:, :, 0].T
+
+    compression_utilisation = np.clip(max_load, 0, None) / safe_pile_capacity
+    if safe_pile_tensile_capacity is None:
+        tension_utilisation = np.full(shape, np.nan)
+    else:
+        tension_utilisation = np.clip(min_load, None, 0) / safe_pile_tensile_capacity
+
+    unresisted = ((max_mx[:, None] > MOMENT_TOLERANCE) & ~carries_mx) | ((max_my[:, None] > MOMENT_TOLERANCE) & ~carries_my)
+    passes = (compression_utilisation <= 1.0) & ~unresisted
+    if safe_pile_tensile_capacity is not None:
+        passes &= tension_utilisation <= 1.0
+    found = passes.any(axis=1)
+    # The largest layout is reported for supports that no layout can carry
+    chosen = np.where(found, passes.argmax(axis=1), len(layouts) - 1)
+
+    rows = np.arange(supports)
+    compression, tension = compression_utilisation[rows, chosen], tension_utilisation[rows, chosen]
+    tension_governs = np.nan_to_num(tension) > compression
+    max_combinations = store.combinations[combinations[max_rows[rows, chosen]]]
+    min_combinations = store.combinations[combinations[min_rows[rows, chosen]]]
+
+    governing = np.where(tension_governs, 'Tension', 'Compression')
+    governing = np.where(found, governing, np.char.add(governing.astype(str), ' (no layout passes)'))
+
+    fz = np.nan_to_num(store.reactions[:, combinations, 2])
+    axial_piles = np.maximum(ceil_divide(np.clip(fz, 0, None).max(axis=1, initial=0), safe_pile_capacity), 1)
+    if safe_pile_tensile_capacity is not None:
+        axial_piles = np.maximum(axial_piles, ceil_divide(np.clip(-fz, 0, None).max(axis=1, initial=0), -safe_pile_tensile_capacity))
+
+    groups = pd.DataFrame({
+        'Support': store.supports,
+        'X Coordinate': store.coordinates[:, 0],
+        'Y Coordinate': store.coordinates[:, 1],
+        'Z Coordinate': store.coordinates[:, 2],
+        'Number of Piles': np.array([layout.piles for layout in layouts])[chosen],
+        'Layout': np.array([layout.name for layout in layouts], dtype=object)[chosen],
+        'Axial Only Piles': axial_piles.astype(int),
+        'Max Pile Load': max_load[rows, chosen],
+        'Max Pile Combination': max_combinations,
+        'Compression Utilisation': compression,
+        'Min Pile Load': min_load[rows, chosen],
+        'Min Pile Combination': min_combinations,
+        'Tension Utilisation': tension,
+        'Governing Combination': np.where(tension_governs, min_combinations, max_combinations),
+        'Governing Check': governing,
+    })
+    return groups[PILE_GROUP_COLUMNS]
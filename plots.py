@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+from plotly.subplots import make_subplots
+
+from functions import COMPONENTS, COMPONENT_OPTIONS, COMPONENT_UNITS, calculate_required_piles, concurrent_columns
+
+# Scatter traces switch to WebGL above this many supports
+WEBGL_THRESHOLD = 1000
+
+# Level of detail of the component bar charts, see select_detail()
+DETAIL_MODES = ['All supports', 'Top supports', 'Page', 'Z level', 'Gridline band']
+GROUP_MODES = ['Z level', 'Gridline band']
+# Above this many supports the app defaults to the top supports instead of one bar per support
+DETAIL_THRESHOLD = 2000
+
+
+def hover_text(new_df, component, signs):
+    # Built with vectorized string operations instead of a row-wise apply
+    unit = COMPONENT_UNITS[component]
+    text = 'Support: ' + new_df['Support'].astype(str)
+    for sign in signs:
+        text = text + f'<br>Max {sign}{component}: ' + new_df[f'Max {sign}{component}'].astype(str) + f' {unit}'
+    for sign in signs:
+        text = text + f'<br>Combination {sign}{component}: ' + new_df[f'Max {sign}{component} Combination'].astype(str)
+
+    # Concurrent reactions when the envelope was generated with concurrent=True
+    for sign in signs:
+        columns = concurrent_columns(component, sign)
+        if not set(columns).issubset(new_df.columns):
+            continue
+        text = text + f'<br>Concurrent at {sign}{component}:'
+        for other, column in zip(COMPONENTS, columns):
+            text = text + f' {other} ' + new_df[column].round(2).astype(str) + f' {COMPONENT_UNITS[other]},'
+        text = text.str.rstrip(',')
+    return text
+
+def select_detail(component, new_df, mode='All supports', top_n=50, page=0, page_size=100, band_width=6.0, band_axis='X'):
+    # Bars to draw for each sign as {sign: (labels, rows of new_df)}, so only the visible subset is serialized.
+    # 'Top supports' and 'Page' rank supports by their larger absolute envelope value, the group modes keep
+    # the governing support of each Z level or band of `band_width` along `band_axis`
+    positive, negative = new_df[f'Max +{component}'], new_df[f'Max -{component}']
+
+    if mode in GROUP_MODES:
+        if mode == 'Z level':
+            keys = new_df['Z Coordinate']
+            labels = keys.map(lambda z: f'Z = {z:g}')
+        else:
+            keys = np.floor(new_df[f'{band_axis} Coordinate'] / band_width) * band_width
+            labels = keys.map(lambda start: f'{band_axis} {start:g} to {start + band_width:g}')
+        bars = {}
+        for sign, rows in (('+', positive.groupby(keys).idxmax()), ('-', negative.groupby(keys).idxmin())):
+            bars[sign] = (labels.loc[rows].to_numpy(), new_df.loc[rows])
+        return bars
+
+    if mode in ('Top supports', 'Page'):
+        magnitude = np.maximum(positive.abs(), negative.abs())
+        order = magnitude.to_numpy().argsort(kind='stable')[::-1]
+        if mode == 'Top supports':
+            order = order[:top_n]
+        else:
+            order = order[page * page_size:(page + 1) * page_size]
+        new_df = new_df.iloc[order]
+
+    return {sign: (new_df['Support'].to_numpy(), new_df) for sign in ('+', '-')}
+
+def generate_component_plot(component, new_df, scatter=go.Scatter, detail=None):
+    detail = detail or {}
+    bars = select_detail(component, new_df, **detail)
+    fig = make_subplots(rows=2, cols=1)
+
+    for sign in ('+', '-'):
+        labels, rows = bars[sign]
+        text = hover_text(rows, component, [sign])
+        if detail.get('mode') in GROUP_MODES:
+            text = labels + '<br>' + text
+        fig.add_trace(go.Bar(
+            x=labels,
+            y=rows[f'Max {sign}{component}'],
+            name=f'Maximum {sign}{component}',
+            text=text,
+            hoverinfo='text'
+        ), row=1, col=1)
+
+    # Supports drawn in the bar chart, each once
+    points = pd.concat([bars['+'][1], bars['-'][1]])
+    points = points[~points.index.duplicated()]
+    fig.add_trace(scatter(
+        x=points['X Coordinate'],
+        y=points['Y Coordinate'],
+        mode='markers',
+        marker=dict(color='blue'),
+        name=f'Max [+/-] {component}',
+        text=hover_text(points, component, ['+', '-']),
+        hoverinfo='text'
+    ), row=2, col=1)
+
+    title = f'Maximum {component} and Support Coordinates'
+    if len(points) < len(new_df):
+        title += f' ({len(points):,} of {len(new_df):,} supports)'
+    fig.update_layout(
+        title=title,
+        autosize=False,
+        width=1300,
+        height=900
+    )
+
+    fig.update_yaxes(automargin=True)
+    return fig
+
+def generate_plot(option, new_df, safe_pile_capacity=None, safe_pile_tensile_capacity=None, webgl_threshold=WEBGL_THRESHOLD, detail=None):
+    fig = go.Figure()
+
+    # Switch to WebGL traces for large models, SVG scatter gets sluggish beyond a few thousand markers
+    scatter = go.Scattergl if len(new_df) > webgl_threshold else go.Scatter
+
+    if safe_pile_capacity is not None:
+        safe_pile_capacity = float(safe_pile_capacity)
+        if not (100 < safe_pile_capacity <= 10000):
+            raise ValueError("Pile capacity is too low or too high")
+
+    if safe_pile_tensile_capacity is not None:
+        try:
+            safe_pile_tensile_capacity = float(safe_pile_tensile_capacity)
+            if safe_pile_tensile_capacity >= 0:
+                raise ValueError("Please enter a negative value for tensile capacity")
+        except ValueError:
+            raise ValueError("Invalid input for tensile capacity")
+    else:
+        safe_pile_tensile_capacity = None
+
+    if option == 'Coordinates':
+        unique_z_levels = new_df['Z Coordinate'].unique()
+        fig = go.Figure()
+
+        for z in unique_z_levels:
+            df_z = new_df[new_df['Z Coordinate'] == z]
+            trace = scatter(
+                x=df_z['X Coordinate'],
+                y=df_z['Y Coordinate'],
+                mode='markers+text',
+                marker=dict(size=10),
+                text=df_z['Support'],
+                name=f'Z = {z}'
+            )
+            fig.add_trace(trace)
+
+        fig.update_layout(
+            title='Support Coordinates',
+            xaxis_title='X Coordinate',
+            yaxis_title='Y Coordinate',
+        )
+
+    elif option in COMPONENT_OPTIONS:
+        # `detail` holds the select_detail() options of the bar chart
+        fig = generate_component_plot(COMPONENT_OPTIONS[option], new_df, scatter, detail)
+
+    elif option == 'Number of Piles':
+        if safe_pile_capacity is None:
+            raise ValueError("Safe pile capacity must be provided for 'Number of Piles' option")
+
+        # Calculate required piles
+        required_piles = calculate_required_piles(new_df, safe_pile_capacity, safe_pile_tensile_capacity)
+
+        # Define color mapping based on number of piles
+        color_map = {
+            1: 'blue',
+            2: 'red',
+            3: 'green',
+            4: "black",
+            5: "orange",
+            6: "brown",
+            7: "yellow",
+            8: "pink"
+    
+        }
+
+        traces = []
+        for pile_number, color in color_map.items():
+            df_pile = new_df[required_piles == pile_number]
+            trace = scatter(
+                x=df_pile['X Coordinate'],
+                y=df_pile['Y Coordinate'],
+                mode='markers',
+                marker=dict(
+                    size=12,
+                    color=color,
+                    line=dict(width=1, color='DarkSlateGrey')
+                ),
+                name=f'{pile_number} Piles'
+            )
+            traces.append(trace)
+
+        for trace in traces:
+            fig.add_trace(trace)
+
+        fig.update_layout(
+            title='Number of Piles required for each Support',
+            xaxis_title='X Coordinate',
+            yaxis_title='Y Coordinate',
+            hovermode='closest'
+        )
+
+
+    else:
+        raise ValueError(f"Invalid option {option}.")
+
+
+    return fig
\ No newline at end of file
@@ -0,0 +1,225 @@
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from functions import (COMPONENTS, COORDINATE_COLUMNS, REACTION_COLUMNS, load_data, generate_data_for_display,
+                       calculate_required_piles)
+
+# Kept out of the parse cache directory: the database is data, not something to rebuild
+STORE_PATH = os.environ.get('TSD_PROJECT_STORE', os.path.join(os.path.expanduser('~'), '.local', 'share', 'tsd_reactions', 'projects.sqlite'))
+
+# Reaction rows are kept wide (one row per support and combination) with indexes on support and
+# combination; the envelope is kept long (one row per support, component and sign) with an index on
+# component and value, which answers threshold queries without scanning the reactions
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS revisions (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    revision TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    safe_pile_capacity REAL,
+    safe_pile_tensile_capacity REAL,
+    supports INTEGER,
+    combinations INTEGER,
+    total_piles INTEGER,
+    UNIQUE (project, revision)
+);
+CREATE TABLE IF NOT EXISTS supports (
+    revision_id INTEGER NOT NULL REFERENCES revisions (id) ON DELETE CASCADE,
+    support TEXT NOT NULL,
+    x REAL, y REAL, z REAL,
+    piles INTEGER
+);
+CREATE TABLE IF NOT EXISTS envelope (
+    revision_id INTEGER NOT NULL REFERENCES revisions (id) ON DELETE CASCADE,
+    support TEXT NOT NULL,
+    component TEXT NOT NULL,
+    sign TEXT NOT NULL,
+    value REAL,
+    combination TEXT
+);
+CREATE TABLE IF NOT EXISTS reactions (
+    revision_id INTEGER NOT NULL REFERENCES revisions (id) ON DELETE CASCADE,
+    support TEXT NOT NULL,
+    combination TEXT NOT NULL,
+    fx REAL, fy REAL, fz REAL, mx REAL, my REAL, mz REAL
+);
+CREATE INDEX IF NOT EXISTS revisions_project ON revisions (project, timestamp);
+CREATE INDEX IF NOT EXISTS supports_revision ON supports (revision_id, support);
+CREATE INDEX IF NOT EXISTS envelope_component ON envelope (component, sign, value);
+CREATE INDEX IF NOT EXISTS envelope_support ON envelope (support, component);
+CREATE INDEX IF NOT EXISTS reactions_support ON reactions (revision_id, support);
+CREATE INDEX IF NOT EXISTS reactions_combination ON reactions (revision_id, combination);
+"""
+
+
+def connect(path=STORE_PATH):
+    if path != ':memory:':
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA foreign_keys = ON')
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def envelope_rows(revision_id, new_df):
+    # Long (support, component, sign) rows of a generate_data_for_display table
+    supports = new_df['Support'].to_numpy(dtype=object)
+    for component in COMPONENTS:
+        for sign in ('+', '-'):
+            column = f'Max {sign}{component}'
+            yield from zip([revision_id] * len(supports), supports, [component] * len(supports), [sign] * len(supports),
+                           new_df[column].astype(float).tolist(), new_df[f'{column} Combination'].astype(str).tolist())
+
+
+def ingest(connection, project, revision, df_data, new_df=None, timestamp=None, safe_pile_capacity=None,
+           safe_pile_tensile_capacity=None, reactions=True):
+    # Store one revision of a project, replacing an earlier ingest of the same revision. `df_data` and
+    # `new_df` are the outputs of load_data and generate_data_for_display; with `reactions=False` only
+    # the envelope and pile counts are kept. Returns the revision id
+    if new_df is None:
+        new_df = generate_data_for_display(df_data)
+    if timestamp is None:
+        timestamp = datetime.now(timezone.utc)
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.isoformat()
+
+    piles = [None] * len(new_df)
+    total_piles = None
+    if safe_pile_capacity is not None:
+        required = calculate_required_piles(new_df, safe_pile_capacity, safe_pile_tensile_capacity).astype(int)
+        piles = required.tolist()
+        total_piles = int(required.sum())
+
+    with connection:
+        connection.execute('DELETE FROM revisions WHERE project = ? AND revision = ?', (project, revision))
+        revision_id = connection.execute(
+            'INSERT INTO revisions (project, revision, timestamp, safe_pile_capacity, safe_pile_tensile_capacity, '
+            'supports, combinations, total_piles) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (project, revision, timestamp, safe_pile_capacity, safe_pile_tensile_capacity,
+             len(new_df), int(df_data['Combination'].nunique()), total_piles)).lastrowid
+
+        coordinates = new_df[COORDINATE_COLUMNS].astype(float).to_numpy().tolist()
+        connection.executemany('INSERT INTO supports VALUES (?, ?, ?, ?, ?, ?)',
+                               ((revision_id, support, *xyz, pile) for support, xyz, pile
+                                in zip(new_df['Support'].tolist(), coordinates, piles)))
+        connection.executemany('INSERT INTO envelope VALUES (?, ?, ?, ?, ?, ?)', envelope_rows(revision_id, new_df))
+
+        if reactions:
+            values = df_data[REACTION_COLUMNS].astype(float).to_numpy().tolist()
+            connection.executemany('INSERT INTO reactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                   ((revision_id, support, combination, *row) for support, combination, row
+                                    in zip(df_data.index.get_level_values('Support').tolist(),
+                                           df_data['Combination'].astype(str).tolist(), values)))
+    return revision_id
+
+
+def query(connection, sql, parameters=()):
+    cursor = connection.execute(sql, parameters)
+    return pd.DataFrame(cursor.fetchall(), columns=[description[0] for description in cursor.description])
+
+
+def revisions(connection, project=None):
+    sql = ('SELECT id AS "Revision Id", project AS "Project", revision AS "Revision", timestamp AS "Timestamp", '
+           'supports AS "Supports", combinations AS "Combinations", total_piles AS "Total Piles" FROM revisions')
+    if project is None:
+        return query(connection, sql + ' ORDER BY project, timestamp')
+    return query(connection, sql + ' WHERE project = ? ORDER BY timestamp', (project,))
+
+
+def supports_exceeding(connection, threshold, component='Fz', sign='+', project=None):
+    # Envelope values beyond `threshold` in any stored revision: above it for sign '+', below
+    # -threshold for sign '-'. Served from the (component, sign, value) index
+    if sign == '+':
+        condition, value = 'e.value > ?', threshold
+    else:
+        condition, value = 'e.value < ?', -threshold
+    sql = ('SELECT r.project AS "Project", r.revision AS "Revision", r.timestamp AS "Timestamp", '
+           'e.support AS "Support", e.value AS "Value", e.combination AS "Combination" '
+           'FROM envelope e JOIN revisions r ON r.id = e.revision_id '
+           f'WHERE e.component = ? AND e.sign = ? AND {condition}')
+    parameters = [component, sign, value]
+    if project is not None:
+        sql += ' AND r.project = ?'
+        parameters.append(project)
+    return query(connection, sql + ' ORDER BY r.project, r.timestamp, e.support', parameters)
+
+
+def support_history(connection, project, support, component='Fz'):
+    # Envelope of one support across the revisions of a project
+    return query(connection,
+                 'SELECT r.revision AS "Revision", r.timestamp AS "Timestamp", e.sign AS "Sign", e.value AS "Value", '
+                 'e.combination AS "Combination" FROM envelope e JOIN revisions r ON r.id = e.revision_id '
+                 'WHERE r.project = ? AND e.support = ? AND e.component = ? ORDER BY r.timestamp, e.sign',
+                 (project, support, component))
+
+
+def pile_trend(connection, project):
+    return query(connection,
+                 'SELECT revision AS "Revision", timestamp AS "Timestamp", supports AS "Supports", '
+                 'safe_pile_capacity AS "Safe Pile Capacity", total_piles AS "Total Piles" '
+                 'FROM revisions WHERE project = ? ORDER BY timestamp', (project,))
+
+
+def reaction_rows(connection, project, revision, support=None, combination=None):
+    # Stored reaction rows of one revision, optionally for one support and/or combination
+    sql = ('SELECT x.support AS "Support", x.combination AS "Combination", '
+           + ', '.join(f'x.{component.lower()} AS "{column}"' for component, column in zip(COMPONENTS, REACTION_COLUMNS))
+           + ' FROM reactions x JOIN revisions r ON r.id = x.revision_id WHERE r.project = ? AND r.revision = ?')
+    parameters = [project, revision]
+    if support is not None:
+        sql += ' AND x.support = ?'
+        parameters.append(support)
+    if combination is not None:
+        sql += ' AND x.combination = ?'
+        parameters.append(combination)
+    return query(connection, sql + ' ORDER BY x.rowid', parameters)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Store TSD reactions of several projects and revisions and query them.')
+    parser.add_argument('--store', default=STORE_PATH, help=f'SQLite database (default: {STORE_PATH})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = commands.add_parser('ingest', help='Add a revision of a project')
+    ingest_parser.add_argument('project')
+    ingest_parser.add_argument('revision')
+    ingest_parser.add_argument('file', help='Foundation Reactions workbook, CSV or Parquet table')
+    ingest_parser.add_argument('-c', '--capacity', type=float, default=None, help='Safe pile axial capacity [kN]')
+    ingest_parser.add_argument('-t', '--tensile-capacity', type=float, default=None,
+                               help='Safe pile tensile capacity [kN], negative')
+    ingest_parser.add_argument('--envelope-only', action='store_true', help='Do not store the reaction rows')
+
+    exceeding_parser = commands.add_parser('exceeding', help='Supports beyond a threshold in any revision')
+    exceeding_parser.add_argument('threshold', type=float)
+    exceeding_parser.add_argument('--component', default='Fz', choices=COMPONENTS)
+    exceeding_parser.add_argument('--sign', default='+', choices=['+', '-'])
+    exceeding_parser.add_argument('--project', default=None)
+
+    trend_parser = commands.add_parser('trend', help='Total piles across the revisions of a project')
+    trend_parser.add_argument('project')
+
+    args = parser.parse_args(argv)
+    connection = connect(args.store)
+
+    if args.command == 'ingest':
+        df_data = load_data(args.file, streaming=True)
+        revision_id = ingest(connection, args.project, args.revision, df_data, safe_pile_capacity=args.capacity,
+                             safe_pile_tensile_capacity=args.tensile_capacity, reactions=not args.envelope_only)
+        print(f'Stored {args.project} {args.revision} as revision {revision_id}')
+        return 0
+
+    if args.command == 'exceeding':
+        result = supports_exceeding(connection, args.threshold, args.component, args.sign, args.project)
+    else:
+        result = pile_trend(connection, args.project)
+    print(result.to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from functions import COMPONENTS, COORDINATE_COLUMNS, REACTION_COLUMNS, concurrent_columns, index_data
+
+
+@dataclass
+class ReactionStore:
+    # Dictionary-encoded support and combination names
+    supports: np.ndarray
+    combinations: np.ndarray
+    # One X/Y/Z row per support, shape (supports, 3)
+    coordinates: np.ndarray
+    # Fx..Mz for every support and combination, shape (supports, combinations, 6); NaN where
+    # a support has no row for a combination
+    reactions: np.ndarray
+    # Integer codes of the original rows, used to rebuild the DataFrame in its original order
+    row_supports: np.ndarray
+    row_combinations: np.ndarray
+    support_codes: dict = field(init=False, repr=False)
+    combination_codes: dict = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.support_codes = {name: code for code, name in enumerate(self.supports)}
+        self.combination_codes = {name: code for code, name in enumerate(self.combinations)}
+
+    @property
+    def nbytes(self):
+        return (self.coordinates.nbytes + self.reactions.nbytes + self.row_supports.nbytes
+                + self.row_combinations.nbytes)
+
+    # The slicing helpers below return views into `reactions`, not copies
+    def support(self, support):
+        return self.reactions[self.support_codes[support]]
+
+    def combination(self, combination):
+        return self.reactions[:, self.combination_codes[combination]]
+
+    def component(self, component):
+        return self.reactions[:, :, COMPONENTS.index(component)]
+
+    def to_frame(self):
+        # Rebuild the frame returned by load_data
+        df_data = pd.DataFrame({'Support': self.supports[self.row_supports]})
+        for i, column in enumerate(COORDINATE_COLUMNS):
+            df_data[column] = self.coordinates[self.row_supports, i]
+        df_data['Combination'] = self.combinations[self.row_combinations]
+        values = self.reactions[self.row_supports, self.row_combinations]
+        for i, column in enumerate(REACTION_COLUMNS):
+            df_data[column] = values[:, i]
+
+        return index_data(df_data)
+
+
+def from_frame(df_data, dtype=np.float64):
+    row_supports, supports = pd.factorize(df_data.index.get_level_values('Support'))
+    row_combinations, combinations = pd.factorize(df_data['Combination'])
+    row_supports = row_supports.astype(np.int32)
+    row_combinations = row_combinations.astype(np.int32)
+
+    if pd.Index(row_supports.astype(np.int64) * len(combinations) + row_combinations).has_duplicates:
+        raise ValueError("Each support can only have one row per combination")
+
+    # Coordinates are taken from the first row of each support
+    _, first_rows = np.unique(row_supports, return_index=True)
+    coordinates = df_data[COORDINATE_COLUMNS].to_numpy(dtype=np.float64)[first_rows]
+
+    reactions = np.full((len(supports), len(combinations), len(REACTION_COLUMNS)), np.nan, dtype=dtype)
+    reactions[row_supports, row_combinations] = df_data[REACTION_COLUMNS].to_numpy(dtype=dtype)
+
+    return ReactionStore(
+        supports=np.asarray(supports, dtype=object),
+        combinations=np.asarray(combinations, dtype=object),
+        coordinates=coordinates,
+        reactions=reactions,
+        row_supports=row_supports,
+        row_combinations=row_combinations,
+    )
+
+
+def store_envelope(store, mask=None, concurrent=False):
+    # Envelope table in the generate_data_for_display layout, computed with masked reductions over
+    # the reaction array. `mask` is a boolean array over store.combinations selecting the subset
+    reactions = store.reactions
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+        valid = mask[None, :, None] & ~np.isnan(reactions)
+    else:
+        valid = ~np.isnan(reactions)
+
+    new_data = {'Support': store.supports.copy()}
+    for i, column in enumerate(COORDINATE_COLUMNS):
+        new_data[column] = store.coordinates[:, i]
+
+    supports = np.arange(len(store.supports))[:, None]
+    components = np.arange(len(COMPONENTS))[None, :]
+    governing = {}
+    for sign, signed, fill in (('+', reactions, -np.inf), ('-', -reactions, -np.inf)):
+        candidates = np.where(valid & (signed > 0), signed, fill)
+        # argmax returns the first combination reaching the extreme, like find_extremes
+        rows = candidates.argmax(axis=1)
+        found = np.take_along_axis(candidates, rows[:, None, :], axis=1)[:, 0, :] > fill
+        governing[sign] = (rows, found)
+        values = reactions[supports, rows, components]
+        for i, component in enumerate(COMPONENTS):
+            new_data[f'Max {sign}{component}'] = np.where(found[:, i], values[:, i], 0.0)
+            new_data[f'Max {sign}{component} Combination'] = np.where(found[:, i], store.combinations[rows[:, i]], '-')
+
+    # Keep the column order of generate_data_for_display
+    columns = ['Support'] + COORDINATE_COLUMNS + [
+        f'Max {sign}{component}{suffix}' for component in COMPONENTS for sign in ('+', '-') for suffix in ('', ' Combination')]
+    new_df = pd.DataFrame(new_data)[columns]
+
+    if concurrent:
+        for i, component in enumerate(COMPONENTS):
+            for sign in ('+', '-'):
+                rows, found = governing[sign]
+                vectors = reactions[np.arange(len(store.supports)), rows[:, i]]
+                vectors[~found[:, i]] = np.nan
+                for column, vector in zip(concurrent_columns(component, sign), vectors.T):
+                    new_df[column] = vector
+
+    return new_df
+
+
+def top_combinations(store, k=3, mask=None, components=COMPONENTS):
+    # The k largest positive and k largest negative values per support and component with their
+    # combinations, using partial selection (argpartition) instead of sorting every combination.
+    # Ties are resolved in favour of the earlier combination, consistent with find_extremes
+    n_supports, n_combinations = store.reactions.shape[:2]
+    k = min(k, n_combinations)
+    if k <= 0 or n_supports == 0:
+        return pd.DataFrame(columns=['Support', 'Envelope', 'Rank', 'Value', 'Combination'])
+
+    excluded = None if mask is None else ~np.asarray(mask, dtype=bool)
+
+    frames = []
+    for component in components:
+        values = store.component(component)
+        for sign, signed in (('+', values), ('-', -values)):
+            # NaN compares False, so missing rows drop out with the wrong-signed values
+            candidates = np.where(signed > 0, signed, -np.inf)
+            if excluded is not None:
+                candidates[:, excluded] = -np.inf
+
+            # k-th largest value per support; everything at or above it is selected. Where ties at
+            # that value select more than k, only the earliest tied combinations are kept
+            boundary = np.partition(candidates, n_combinations - k, axis=1)[:, n_combinations - k]
+            selected = candidates >= boundary[:, None]
+            excess = selected.sum(axis=1) > k
+            if excess.any():
+                tied = candidates[excess]
+                above = tied > boundary[excess, None]
+                equal = tied == boundary[excess, None]
+                needed = k - above.sum(axis=1)
+                selected[excess] = above | (equal & (np.cumsum(equal, axis=1) <= needed[:, None]))
+            rows = np.nonzero(selected)[1].reshape(n_supports, k)
+
+            chosen = np.take_along_axis(candidates, rows, axis=1)
+            order = np.lexsort((rows, -chosen), axis=1)
+            rows = np.take_along_axis(rows, order, axis=1)
+            chosen = np.take_along_axis(chosen, order, axis=1)
+
+            found = np.isfinite(chosen).ravel()
+            frames.append(pd.DataFrame({
+                'Support': np.repeat(store.supports, k)[found],
+                'Envelope': f'Max {sign}{component}',
+                'Rank': np.tile(np.arange(1, k + 1), n_supports)[found],
+                'Value': (chosen if sign == '+' else -chosen).ravel()[found],
+                'Combination': store.combinations[rows.ravel()[found]],
+            }))
+
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+
+from functions import (COMPONENTS, COORDINATE_COLUMNS, REACTION_COLUMNS, load_data, generate_data_for_display,
+                       calculate_required_piles)
+
+
+def row_hashes(df_data):
+    # One hash per reaction row, including its position within the support block so that
+    # reordered rows change the fingerprint
+    rows = df_data[COORDINATE_COLUMNS + ['Combination'] + REACTION_COLUMNS].reset_index()
+    return pd.util.hash_pandas_object(rows, index=False).to_numpy()
+
+
+def pair_hashes(df_data):
+    # One hash per (support, combination) row without its position, so combinations can be compared
+    # over the supports that two revisions have in common
+    rows = df_data[COORDINATE_COLUMNS + ['Combination'] + REACTION_COLUMNS]
+    index = pd.MultiIndex.from_arrays([df_data.index.get_level_values('Support'), df_data['Combination'].to_numpy()],
+                                      names=['Support', 'Combination'])
+    return pd.Series(pd.util.hash_pandas_object(rows, index=False).to_numpy(), index=index)
+
+
+def fingerprints(df_data):
+    hashes = pd.Series(row_hashes(df_data), index=df_data.index)
+    supports = hashes.groupby(level='Support', sort=False).sum()
+    return supports, pair_hashes(df_data)
+
+
+def combination_fingerprints(pairs, supports):
+    # Per-combination fingerprint over `supports` only
+    pairs = pairs[pairs.index.get_level_values('Support').isin(supports)]
+    return pairs.groupby(level='Combination', sort=False).sum()
+
+
+def compare_combinations(previous_pairs, pairs):
+    # Added and removed combinations by name; changed ones by their rows at the supports present in
+    # both revisions, so adding or removing a support only shows up in the support diff
+    previous_names = previous_pairs.index.get_level_values('Combination').unique()
+    names = pairs.index.get_level_values('Combination').unique()
+    common_supports = pairs.index.get_level_values('Support').unique().intersection(
+        previous_pairs.index.get_level_values('Support').unique(), sort=False)
+    changes = compare_fingerprints(combination_fingerprints(previous_pairs, common_supports),
+                                   combination_fingerprints(pairs, common_supports))
+    return {
+        'added': names.difference(previous_names, sort=False).tolist(),
+        'removed': previous_names.difference(names, sort=False).tolist(),
+        'changed': changes['changed'],
+    }
+
+
+def required_piles(new_df, safe_pile_capacity, safe_pile_tensile_capacity):
+    if safe_pile_capacity is None:
+        return pd.Series(dtype=int)
+    piles = calculate_required_piles(new_df, safe_pile_capacity, safe_pile_tensile_capacity).astype(int)
+    return pd.Series(piles.to_numpy(), index=new_df['Support'], name='Number of Piles')
+
+
+def analyse(df_data, safe_pile_capacity=None, safe_pile_tensile_capacity=None):
+    new_df = generate_data_for_display(df_data)
+    support_fingerprints, pair_fingerprints = fingerprints(df_data)
+    return {
+        'df_data': df_data,
+        'new_df': new_df,
+        'piles': required_piles(new_df, safe_pile_capacity, safe_pile_tensile_capacity),
+        'support_fingerprints': support_fingerprints,
+        'pair_fingerprints': pair_fingerprints,
+        'safe_pile_capacity': safe_pile_capacity,
+        'safe_pile_tensile_capacity': safe_pile_tensile_capacity,
+    }
+
+
+def compare_fingerprints(previous, current):
+    common = current.index.intersection(previous.index, sort=False)
+    return {
+        'added': current.index.difference(previous.index, sort=False).tolist(),
+        'removed': previous.index.difference(current.index, sort=False).tolist(),
+        'changed': common[current[common].to_numpy() != previous[common].to_numpy()].tolist(),
+    }
+
+
+def reanalyse(previous, file_path, safe_pile_capacity=None, safe_pile_tensile_capacity=None, streaming=True):
+    # Re-process a new revision of a model, recomputing envelopes and pile counts only for supports
+    # whose rows changed. `previous` is the result of analyse() or reanalyse(); `file_path` may also
+    # be an already loaded df_data
+    df_data = file_path if isinstance(file_path, pd.DataFrame) else load_data(file_path, streaming=streaming)
+    support_fingerprints, pair_fingerprints = fingerprints(df_data)
+
+    support_changes = compare_fingerprints(previous['support_fingerprints'], support_fingerprints)
+    combination_changes = compare_combinations(previous['pair_fingerprints'], pair_fingerprints)
+    recompute = support_changes['added'] + support_changes['changed']
+
+    # Envelope rows of unchanged supports are reused, only changed and new supports are recomputed
+    support_levels = df_data.index.get_level_values('Support')
+    partial_df = generate_data_for_display(df_data[support_levels.isin(recompute)])
+    previous_df = previous['new_df'].set_index('Support', drop=False)
+    new_df = pd.concat([previous_df.drop(index=support_changes['changed'] + support_changes['removed']),
+                        partial_df.set_index('Support', drop=False)])
+    new_df = new_df.loc[support_fingerprints.index].reset_index(drop=True)
+
+    same_capacities = (previous['safe_pile_capacity'] == safe_pile_capacity
+                       and previous['safe_pile_tensile_capacity'] == safe_pile_tensile_capacity)
+    if same_capacities and safe_pile_capacity is not None:
+        partial_piles = required_piles(partial_df, safe_pile_capacity, safe_pile_tensile_capacity)
+        piles = pd.concat([previous['piles'].drop(index=support_changes['changed'] + support_changes['removed']),
+                           partial_piles])
+        piles = piles.loc[support_fingerprints.index]
+    else:
+        piles = required_piles(new_df, safe_pile_capacity, safe_pile_tensile_capacity)
+
+    result = {
+        'df_data': df_data,
+        'new_df': new_df,
+        'piles': piles,
+        'support_fingerprints': support_fingerprints,
+        'pair_fingerprints': pair_fingerprints,
+        'safe_pile_capacity': safe_pile_capacity,
+        'safe_pile_tensile_capacity': safe_pile_tensile_capacity,
+    }
+
+    diff = {
+        'added_supports': support_changes['added'],
+        'removed_supports': support_changes['removed'],
+        'changed_supports': support_changes['changed'],
+        'added_combinations': combination_changes['added'],
+        'removed_combinations': combination_changes['removed'],
+        'changed_combinations': combination_changes['changed'],
+        'governing_changes': governing_changes(previous_df, partial_df, support_changes['changed']),
+        'pile_changes': pile_changes(previous['piles'], piles),
+    }
+    return result, diff
+
+
+def governing_changes(previous_df, partial_df, changed):
+    # Changed governing combinations of the supports whose rows changed
+    before = previous_df.loc[changed]
+    after = partial_df.set_index('Support').loc[changed]
+
+    changes = []
+    for component in COMPONENTS:
+        for sign in ('+', '-'):
+            column = f'Max {sign}{component} Combination'
+            moved = before[column].to_numpy() != after[column].to_numpy()
+            changes.append(pd.DataFrame({
+                'Support': np.asarray(changed, dtype=object)[moved],
+                'Envelope': f'Max {sign}{component}',
+                'Previous Combination': before[column].to_numpy()[moved],
+                'New Combination': after[column].to_numpy()[moved],
+                'Previous Value': before[f'Max {sign}{component}'].to_numpy()[moved],
+                'New Value': after[f'Max {sign}{component}'].to_numpy()[moved],
+            }))
+
+    return pd.concat(changes, ignore_index=True)
+
+
+def pile_changes(previous_piles, piles):
+    common = piles.index.intersection(previous_piles.index, sort=False)
+    before = previous_piles[common].to_numpy()
+    after = piles[common].to_numpy()
+    changed = before != after
+    return pd.DataFrame({
+        'Support': common[changed],
+        'Previous Piles': before[changed],
+        'New Piles': after[changed],
+    })
@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import shapely
+from shapely import STRtree
+
+
+@dataclass
+class SpatialIndex:
+    # STRtree over the support X/Y positions of an envelope table from generate_data_for_display
+    new_df: pd.DataFrame
+    # One point per support, None where a coordinate is missing (NaN in CSV or Parquet tables);
+    # the tree skips those supports
+    points: np.ndarray
+    tree: STRtree
+    # Supports with both X and Y coordinates
+    located: int
+    # Largest side of the bounding box of all supports, used to size nearest-neighbour searches
+    extent: float
+    # Envelope columns as plain arrays so region aggregates avoid DataFrame overhead
+    max_positive_fz: np.ndarray
+    max_negative_fz: np.ndarray
+
+    def query(self, geometry, z=None):
+        # Positions of the supports inside (or on the boundary of) a shapely geometry
+        positions = np.sort(self.tree.query(geometry, predicate='intersects'))
+        if z is not None:
+            positions = positions[self.new_df['Z Coordinate'].to_numpy()[positions] == z]
+        return positions
+
+    def within(self, geometry, z=None):
+        return self.new_df.iloc[self.query(geometry, z)]
+
+    def within_box(self, min_x, min_y, max_x, max_y, z=None):
+        return self.within(shapely.box(min_x, min_y, max_x, max_y), z)
+
+    def nearest_positions(self, x, y, k=1):
+        # Positions and distances of the k supports closest to (x, y), nearest first. The
+        # search radius grows until the tree returns at least k candidates, supports without
+        # coordinates are never returned
+        k = min(k, self.located)
+        if k <= 0:
+            return np.array([], dtype=int), np.array([])
+
+        point = shapely.Point(x, y)
+        radius = max(self.extent, 1.0) * np.sqrt(k / self.located)
+        candidates = self.tree.query(point, predicate='dwithin', distance=radius)
+        while len(candidates) < k:
+            radius *= 2
+            candidates = self.tree.query(point, predicate='dwithin', distance=radius)
+
+        distances = shapely.distance(self.points[candidates], point)
+        closest = np.argsort(distances, kind='stable')[:k]
+        return candidates[closest], distances[closest]
+
+    def nearest(self, x, y, k=1):
+        positions, distances = self.nearest_positions(x, y, k)
+        return self.new_df.iloc[positions].assign(Distance=distances)
+
+    def clusters(self, distance):
+        # Group supports whose X/Y positions are within `distance` of each other (transitively),
+        # e.g. candidates for a shared pile cap. Returns one cluster label per support; supports
+        # without coordinates are clusters of their own
+        left, right = self.tree.query(self.points, predicate='dwithin', distance=distance)
+        labels = np.arange(len(self.points))
+
+        # Propagate the smallest label through every pair until nothing changes
+        while True:
+            previous = labels.copy()
+            np.minimum.at(labels, left, labels[right])
+            np.minimum.at(labels, right, labels[left])
+            labels = labels[labels]
+            if np.array_equal(labels, previous):
+                break
+
+        return pd.Series(pd.factorize(labels)[0], index=self.new_df.index, name='Cluster')
+
+    def region_summary(self, geometry, piles=None, z=None):
+        # Demand and pile count aggregated over the supports inside a region
+        positions = self.query(geometry, z)
+        summary = {
+            'Supports': len(positions),
+            'Total Max +Fz': float(self.max_positive_fz[positions].sum()),
+            'Total Max -Fz': float(self.max_negative_fz[positions].sum()),
+        }
+        if piles is not None:
+            summary['Total Piles'] = int(np.asarray(piles)[positions].sum())
+        return summary
+
+
+def build_spatial_index(new_df):
+    new_df = new_df.reset_index(drop=True)
+    x, y = new_df['X Coordinate'].to_numpy(dtype=float), new_df['Y Coordinate'].to_numpy(dtype=float)
+    located = np.isfinite(x) & np.isfinite(y)
+    points = np.where(located, shapely.points(x, y), None)
+    min_x, min_y, max_x, max_y = shapely.total_bounds(points)
+    extent = float(max(max_x - min_x, max_y - min_y)) if located.any() else 0.0
+    return SpatialIndex(
+        new_df=new_df,
+        points=points,
+        tree=STRtree(points),
+        located=int(located.sum()),
+        extent=extent,
+        max_positive_fz=new_df['Max +Fz'].to_numpy(dtype=float),
+        max_negative_fz=new_df['Max -Fz'].to_numpy(dtype=float),
+    )
@@ -0,0 +1,86 @@
+import argparse
+
+import numpy as np
+import openpyxl
+
+from functions import SHEET_NAME, WALL_SUPPORTS_MARKER
+
+HEADER = [
+    ['Foundation Reactions'],
+    [],
+    ['Foundation Reactions, First-order linear, Service Factors, Local Support Axis System'],
+    [],
+    ['Supports'],
+    ['Support', 'Coordinates [m]', None, None, 'Reference', 'Size', 'Result rotation', 'Combination', 'Reactions'],
+    [None, 'X', 'Y', 'Z', None, None, '[°]', None, 'Fx\n[kN]', 'Fy\n[kN]', 'Fz\n[kN]', 'Mx\n[kNm]', 'My\n[kNm]', 'Mz\n[kNm]'],
+]
+
+TRAILER = [
+    [],
+    [],
+    [WALL_SUPPORTS_MARKER],
+    ['No results available.'],
+    [],
+    ['Core Supports'],
+    ['No results available.'],
+]
+
+
+def combination_names(combinations):
+    families = ['1.35G+1.5Q+1.5RQ', '1.35G+1.5Q+1.5ψ0S+1.5ψ0W+EHFDir1+', '1.35G+1.5ψ0Q+1.5ψ0S+1.5W+EHFDir2-', 'G+1.5W+EHFDir2-']
+    return [f'{i + 1} (Final) STR{i // 20 + 1}.{i % 20 + 1}-{families[i % len(families)]}' for i in range(combinations)]
+
+
+def generate_reactions(supports, combinations, seed=0):
+    # Gravity dominated Fz with wind-like variation between combinations, sized like a steel frame
+    rng = np.random.default_rng(seed)
+    base = rng.normal([0, 0, 300, 0, 0, 0], [15, 15, 120, 5, 5, 0.5], size=(supports, 1, 6))
+    factors = rng.normal(1.0, 0.35, size=(1, combinations, 1))
+    variation = rng.normal(0, [20, 20, 80, 8, 8, 0.5], size=(supports, combinations, 6))
+    return base * factors + variation
+
+
+def write_workbook(file_path, supports=100, combinations=50, seed=0):
+    # Write a 'Foundation Reactions' sheet in the layout load_data expects: 7 header rows,
+    # support blocks with the support columns filled on the first row only, three unused
+    # Reference/Size/rotation columns and the 'Wall Supports' trailer
+    rng = np.random.default_rng(seed)
+    grid = int(np.ceil(np.sqrt(supports)))
+    x = np.round((np.arange(supports) % grid) * 6.0 + rng.normal(0, 0.05, supports), 3)
+    y = np.round((np.arange(supports) // grid) * 4.5 + rng.normal(0, 0.05, supports), 3)
+    z = np.where(rng.random(supports) < 0.1, -1.5, 0.0)
+    names = combination_names(combinations)
+    reactions = generate_reactions(supports, combinations, seed).tolist()
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(SHEET_NAME)
+    for row in HEADER:
+        sheet.append(row)
+
+    for s in range(supports):
+        for c in range(combinations):
+            if c == 0:
+                support_columns = [f'SUP #{s + 1}', float(x[s]), float(y[s]), float(z[s]), f'SC #{s + 1}', 'HEA140', 0]
+            else:
+                support_columns = [None] * 7
+            sheet.append(support_columns + [names[c]] + reactions[s][c])
+
+    for row in TRAILER:
+        sheet.append(row)
+
+    workbook.save(file_path)
+    return file_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a synthetic TSD Foundation Reactions workbook.')
+    parser.add_argument('output', help='Path of the xlsx file to write')
+    parser.add_argument('-s', '--supports', type=int, default=100)
+    parser.add_argument('-c', '--combinations', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    write_workbook(args.output, args.supports, args.combinations, args.seed)
+
+
+if __name__ == '__main__':
+    main()
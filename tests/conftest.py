@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+import pytest
+
+# Parsed tables and project databases of the tests never touch the user's directories
+os.environ.setdefault('TSD_CACHE_DIR', tempfile.mkdtemp(prefix='tsd-cache-'))
+os.environ.setdefault('TSD_PROJECT_STORE', os.path.join(tempfile.mkdtemp(prefix='tsd-store-'), 'projects.sqlite'))
+
+EXAMPLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'TSD Steel Frame Example.xlsx')
+
+
+@pytest.fixture(scope='session')
+def example_path():
+    # The example workbook shipped with the app
+    return EXAMPLE
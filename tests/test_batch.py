@@ -0,0 +1,42 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import batch
+from functions import calculate_required_piles, generate_data_for_display, load_data
+
+
+def test_workbooks_with_the_same_name_get_separate_summaries(tmp_path, example_path):
+    for revision in ('rev1', 'rev2'):
+        os.makedirs(tmp_path / revision)
+        shutil.copy(example_path, tmp_path / revision / 'tower.xlsx')
+    output = tmp_path / 'summaries'
+
+    index = batch.run_batch([str(tmp_path / 'rev1'), str(tmp_path / 'rev2')], str(output), workers=2)
+
+    assert (index['Status'] == 'ok').all()
+    assert index['Summary'].nunique() == 2
+    assert sorted(os.listdir(output)) == ['index.csv', 'tower_2_summary.csv', 'tower_summary.csv']
+
+
+def test_summary_names_ignore_case():
+    assert batch.summary_names(['a/Tower.xlsx', 'b/tower.csv', 'c/tower_2.xlsx']) == [
+        'Tower_summary.csv', 'tower_2_summary.csv', 'tower_2_2_summary.csv']
+
+
+def test_tensile_capacity_option(tmp_path, example_path):
+    output = tmp_path / 'summaries'
+    # The example uplift is small, so a small capacity to make it govern
+    assert batch.main([example_path, '-o', str(output), '-j', '1', '-t', '-1']) == 0
+
+    summary = pd.read_csv(output / 'TSD Steel Frame Example_summary.csv')
+    new_df = generate_data_for_display(load_data(example_path))
+    assert summary['Number of Piles'].tolist() == calculate_required_piles(new_df, 600.0, -1.0).astype(int).tolist()
+    assert summary['Number of Piles'].sum() > calculate_required_piles(new_df, 600.0).sum()
+
+
+def test_non_negative_tensile_capacity_is_rejected(tmp_path, example_path):
+    with pytest.raises(SystemExit):
+        batch.main([example_path, '-o', str(tmp_path), '-t', '0'])
@@ -0,0 +1,74 @@
+import os
+
+import pandas as pd
+
+import cache
+import project_store
+from functions import generate_data_for_display, load_data
+
+
+def test_invalidate_keeps_other_files(tmp_path, example_path):
+    cache_dir = str(tmp_path)
+    cache.load_cached(example_path, cache_dir=cache_dir)
+    connection = project_store.connect(os.path.join(cache_dir, 'projects.sqlite'))
+    connection.close()
+    assert len(cache.cache_entries(cache_dir)) == 1
+
+    cache.invalidate(cache_dir=cache_dir)
+
+    assert cache.cache_entries(cache_dir) == []
+    assert os.listdir(cache_dir) == ['projects.sqlite']
+
+
+def test_cached_tables_match_a_fresh_parse(tmp_path, example_path):
+    cache_dir = str(tmp_path)
+    key = cache.cache_key(example_path)
+    cache.invalidate(key, cache_dir=cache_dir)
+    cache.load_cached(example_path, cache_dir=cache_dir)
+    # Read back from disk, not from memory
+    df_data, new_df = cache.read_cache(key, cache_dir)
+
+    fresh = load_data(example_path)
+    pd.testing.assert_frame_equal(df_data, fresh)
+    pd.testing.assert_frame_equal(new_df, generate_data_for_display(fresh, concurrent=True))
+
+    cache.invalidate(cache_dir=cache_dir)
+    assert cache.read_cache(key, cache_dir) is None
+
+
+def test_concurrent_writes_of_the_same_key(tmp_path, example_path):
+    cache_dir = str(tmp_path)
+    df_data = load_data(example_path)
+    new_df = generate_data_for_display(df_data)
+    key = cache.cache_key(example_path)
+
+    # The second writer finds the entry written by the first one
+    cache.write_cache(key, df_data, new_df, cache_dir)
+    cache.write_cache(key, df_data, new_df, cache_dir)
+
+    assert os.listdir(cache_dir) == [key]
+    pd.testing.assert_frame_equal(cache.read_cache(key, cache_dir)[1], new_df)
+
+
+def test_project_store_default_is_outside_the_cache():
+    store_dir = os.path.dirname(os.path.abspath(project_store.STORE_PATH))
+    cache_dir = os.path.abspath(cache.CACHE_DIR)
+    assert os.path.commonpath([store_dir, cache_dir]) != cache_dir
+
+
+def test_derived_tables_are_computed_once_per_file_key():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    key = 'f' * 64
+    assert cache.derived((key, 'store'), compute) == 1
+    assert cache.derived((key, 'store'), compute) == 1
+    assert cache.derived((f'{key}:Wind:', 'store'), compute) == 2
+
+    # Invalidating a file also drops the results of its subsets
+    cache.invalidate(key)
+    assert cache.derived((key, 'store'), compute) == 3
+    assert cache.derived((f'{key}:Wind:', 'store'), compute) == 4
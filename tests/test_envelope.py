@@ -0,0 +1,99 @@
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from functions import (COMPONENTS, DATA_COLUMNS, REACTION_COLUMNS, concurrent_reactions_from_display, find_extremes,
+                       generate_concurrent_reactions, generate_data_for_display, index_data, load_data)
+from reaction_store import from_frame, store_envelope
+
+
+def reference_envelope(df_data):
+    # The original per-support loop over find_extremes, kept as the reference for the vectorized envelope
+    rows = []
+    for support in df_data.index.get_level_values('Support').unique():
+        block = df_data.loc[support]
+        row = {
+            'Support': support,
+            'X Coordinate': block['X Coordinate'].unique()[0],
+            'Y Coordinate': block['Y Coordinate'].unique()[0],
+            'Z Coordinate': block['Z Coordinate'].unique()[0],
+        }
+        for component, column in zip(COMPONENTS, REACTION_COLUMNS):
+            positive, positive_combination, negative, negative_combination = find_extremes(block[column], block['Combination'])
+            row[f'Max +{component}'] = positive
+            row[f'Max +{component} Combination'] = positive_combination
+            row[f'Max -{component}'] = negative
+            row[f'Max -{component} Combination'] = negative_combination
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def assert_same_envelope(new_df, expected):
+    assert list(new_df.columns) == list(expected.columns)
+    for column in expected.columns:
+        if column.endswith('Combination') or column in ('Support', 'Envelope'):
+            assert new_df[column].astype(str).tolist() == expected[column].astype(str).tolist(), column
+        else:
+            np.testing.assert_allclose(new_df[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float),
+                                       err_msg=column)
+
+
+def test_envelope_matches_reference_loop_on_example(example_path):
+    df_data = load_data(example_path)
+    assert_same_envelope(generate_data_for_display(df_data), reference_envelope(df_data))
+
+
+@pytest.fixture
+def awkward_data():
+    # Interleaved supports, ties, all-NaN and single-sign columns
+    rows = [
+        ('B', 1.0, 0.0, 0.0, 'C1', 5.0, np.nan, -1.0, 0.0, 2.0, 0.0),
+        ('A', 0.0, 0.0, 0.0, 'C1', 3.0, np.nan, 4.0, 0.0, -2.0, 1.0),
+        ('B', 1.0, 0.0, 0.0, 'C2', 5.0, np.nan, -3.0, 0.0, -2.0, 0.0),
+        ('A', 0.0, 0.0, 0.0, 'C2', -3.0, np.nan, 4.0, 0.0, 2.0, np.nan),
+        ('B', 1.0, 0.0, 0.0, 'C3', np.nan, np.nan, -3.0, 0.0, 1.0, -1.0),
+        ('A', 0.0, 0.0, 0.0, 'C3', -3.0, np.nan, 1.0, 0.0, -2.0, 1.0),
+    ]
+    return index_data(pd.DataFrame(rows, columns=DATA_COLUMNS))
+
+
+def test_envelope_matches_reference_loop_on_awkward_data(awkward_data):
+    assert_same_envelope(generate_data_for_display(awkward_data), reference_envelope(awkward_data))
+
+
+def test_concurrent_envelope_keeps_the_plain_columns(awkward_data):
+    plain = generate_data_for_display(awkward_data)
+    concurrent = generate_data_for_display(awkward_data, concurrent=True)
+    assert_same_envelope(concurrent[plain.columns], plain)
+
+
+@pytest.mark.parametrize('components', [COMPONENTS, ['Fz']])
+def test_concurrent_reactions_from_display_match_the_rows(awkward_data, components):
+    expected = generate_concurrent_reactions(awkward_data)
+    expected = expected[expected['Envelope'].isin([f'Max {sign}{c}' for c in components for sign in '+-'])]
+
+    concurrent = concurrent_reactions_from_display(generate_data_for_display(awkward_data, concurrent=True), components)
+
+    assert_same_envelope(concurrent.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_concurrent_reactions_of_a_subset_envelope(example_path):
+    df_data = load_data(example_path)
+    store = from_frame(df_data)
+    mask = np.arange(len(store.combinations)) % 3 == 0
+    subset = df_data[df_data['Combination'].isin(store.combinations[mask])]
+
+    concurrent = concurrent_reactions_from_display(store_envelope(store, mask, concurrent=True))
+
+    assert_same_envelope(concurrent, generate_concurrent_reactions(subset))
+
+
+@pytest.mark.parametrize('streaming', [True, False])
+def test_missing_sheet_raises_value_error(tmp_path, streaming):
+    workbook = openpyxl.Workbook()
+    workbook.active.title = 'Other'
+    workbook.save(tmp_path / 'other.xlsx')
+
+    with pytest.raises(ValueError, match="'Foundation Reactions' not found"):
+        load_data(str(tmp_path / 'other.xlsx'), streaming=streaming)
@@ -0,0 +1,37 @@
+import io
+
+import openpyxl
+
+from export import combination_check_rows, export_tables, write_xlsx
+from functions import generate_data_for_display, load_data
+from pile_check import check_piles
+from reaction_store import from_frame
+
+
+def test_long_tables_continue_on_numbered_sheets(example_path):
+    df_data = load_data(example_path)
+    store = from_frame(df_data)
+    tables = export_tables(generate_data_for_display(df_data), store, 600.0, -100.0, per_combination=True)
+    expected = list(combination_check_rows(store, check_piles(store, 600.0, -100.0), 600.0, -100.0))
+
+    max_rows = 1000
+    workbook = openpyxl.load_workbook(write_xlsx(io.BytesIO(), tables, max_rows=max_rows), read_only=True)
+
+    parts = -(-(len(expected) - 1) // (max_rows - 1))
+    checks = ['Combination Checks'] + [f'Combination Checks {part}' for part in range(2, parts + 1)]
+    assert workbook.sheetnames == ['Envelope', 'Pile Schedule'] + checks
+
+    rows = []
+    for name in checks:
+        sheet_rows = list(workbook[name].iter_rows(values_only=True))
+        assert len(sheet_rows) <= max_rows
+        assert list(sheet_rows[0]) == expected[0]
+        rows.extend(sheet_rows[1:])
+    assert len(rows) == len(expected) - 1
+    assert [row[:2] for row in rows] == [tuple(row[:2]) for row in expected[1:]]
+
+
+def test_short_tables_stay_on_one_sheet():
+    workbook = openpyxl.load_workbook(write_xlsx(io.BytesIO(), {'Table': [['A'], [1], [2]], 'Empty': []}, max_rows=3))
+    assert workbook.sheetnames == ['Table', 'Empty']
+    assert [row for row in workbook['Table'].iter_rows(values_only=True)] == [('A',), (1,), (2,)]
@@ -0,0 +1,34 @@
+import pytest
+
+import figure_cache
+from functions import generate_data_for_display, load_data
+
+
+@pytest.fixture(scope='module')
+def new_df(example_path):
+    return generate_data_for_display(load_data(example_path))
+
+
+def test_detail_is_ignored_outside_component_charts():
+    assert (figure_cache.figure_key('file', 'Number of Piles', 600.0, -100.0, {'mode': 'Top supports', 'top_n': 5})
+            == figure_cache.figure_key('file', 'Number of Piles', 600.0, -100.0))
+
+
+def test_all_supports_is_the_same_as_no_detail():
+    assert (figure_cache.figure_key('file', 'Maximum Fz', detail={'mode': 'All supports'})
+            == figure_cache.figure_key('file', 'Maximum Fz'))
+    assert (figure_cache.figure_key('file', 'Maximum Fz', detail={'mode': 'Top supports', 'top_n': 5})
+            != figure_cache.figure_key('file', 'Maximum Fz'))
+
+
+@pytest.mark.parametrize('warm_detail, lookup_detail', [(None, {'mode': 'All supports'}), ({'mode': 'All supports'}, None)])
+def test_warmed_figures_are_found(new_df, warm_detail, lookup_detail):
+    figure_cache.clear()
+    figure_cache.warm_figures('example', new_df, ['Maximum Fx', 'Number of Piles'], 600.0, -100.0, warm_detail)
+    for option in ('Maximum Fx', 'Number of Piles'):
+        key = figure_cache.figure_key('example', option, 600.0, -100.0, lookup_detail)
+        with figure_cache._lock:
+            pending = figure_cache._pending.get(key)
+        if pending is not None:
+            pending.result()
+        assert key in figure_cache._figures
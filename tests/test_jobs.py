@@ -0,0 +1,46 @@
+import pytest
+
+import cache
+import diagnostics
+import jobs
+
+
+@pytest.fixture
+def uncached(example_path):
+    # The example is parsed again rather than served from an earlier test's cache entry
+    cache.invalidate(cache.cache_key(example_path))
+
+
+def test_parse_job_collects_worker_diagnostics(uncached, example_path):
+    diagnostics.enable()
+    try:
+        job = jobs.start_parse(example_path, cache.cache_key(example_path))
+        df_data, new_df = job.result()
+        stages = [record['Stage'] for record in job.records]
+        assert stages == ['cache lookup', 'load_data', 'generate_data_for_display', 'cache write']
+
+        diagnostics.extend(job.records)
+        assert [record['Stage'] for record in diagnostics.records()] == stages
+    finally:
+        diagnostics.disable()
+
+
+def test_parse_job_without_diagnostics_records_nothing(uncached, example_path):
+    diagnostics.disable()
+    job = jobs.start_parse(example_path, cache.cache_key(example_path))
+    job.result()
+    assert job.records == []
+
+
+def test_load_is_cancelled_between_stages(uncached, tmp_path, example_path):
+    cache_dir = str(tmp_path)
+    calls = []
+
+    def checkpoint():
+        calls.append(len(calls))
+        if len(calls) == 2:
+            raise jobs.ParseCancelled('example')
+
+    with pytest.raises(jobs.ParseCancelled):
+        cache.load_cached(example_path, cache_dir=cache_dir, checkpoint=checkpoint)
+    assert cache.cache_entries(cache_dir) == []
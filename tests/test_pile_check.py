@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from functions import calculate_required_piles, generate_data_for_display, load_data
+from pile_check import build_load_index
+
+
+@pytest.fixture(scope='module')
+def new_df(example_path):
+    return generate_data_for_display(load_data(example_path))
+
+
+@pytest.mark.parametrize('tensile_capacity', [None, -1.0, -100.0])
+def test_load_index_matches_calculate_required_piles(new_df, tensile_capacity):
+    load_index = build_load_index(new_df, tensile_capacity)
+    capacities = np.arange(100.0, 1001.0, 50.0)
+
+    expected = [calculate_required_piles(new_df, capacity, tensile_capacity).to_numpy() for capacity in capacities]
+    for capacity, piles in zip(capacities, expected):
+        assert load_index.pile_counts(capacity).tolist() == piles.astype(int).tolist()
+    assert load_index.total_piles(capacities).tolist() == [int(piles.sum()) for piles in expected]
+
+
+@pytest.mark.parametrize('tensile_capacity', [0.0, 100.0])
+def test_load_index_rejects_non_negative_tensile_capacity(new_df, tensile_capacity):
+    with pytest.raises(ValueError, match='negative value'):
+        build_load_index(new_df, tensile_capacity)
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+import pile_groups
+from functions import load_data
+from reaction_store import ReactionStore, from_frame
+
+
+def reference_groups(store, safe_pile_capacity, safe_pile_tensile_capacity=None):
+    # Every pile of every layout for every support and combination, one support at a time
+    layouts = pile_groups.standard_layouts()
+    rows = []
+    for i in range(len(store.supports)):
+        reactions = np.nan_to_num(store.reactions[i])
+        moment_x, moment_y = np.abs(reactions[:, 3]).max(), np.abs(reactions[:, 4]).max()
+        for layout in layouts:
+            mx, my = layout.coefficients()
+            loads = reactions[:, 2, None] / layout.piles + reactions[:, 3, None] * mx + reactions[:, 4, None] * my
+            carries_mx, carries_my = layout.lever_arms()
+            unresisted = ((moment_x > pile_groups.MOMENT_TOLERANCE and not carries_mx)
+                          or (moment_y > pile_groups.MOMENT_TOLERANCE and not carries_my))
+            passes = loads.max() <= safe_pile_capacity and not unresisted
+            if safe_pile_tensile_capacity is not None:
+                passes &= loads.min() >= safe_pile_tensile_capacity
+            if passes:
+                break
+        rows.append((layout.piles, loads.max(), loads.min(), store.combinations[loads.max(axis=1).argmax()]))
+    return rows
+
+
+def random_store(supports, combinations, seed=0):
+    rng = np.random.default_rng(seed)
+    reactions = rng.standard_normal((supports, combinations, 6)) * [10, 10, 800, 100, 100, 5]
+    # Pinned supports without moments and a missing row
+    reactions[::3, :, 3:5] = 0.0
+    reactions[1, 0] = np.nan
+    return ReactionStore(
+        supports=np.array([f'S{i}' for i in range(supports)], dtype=object),
+        combinations=np.array([f'C{i}' for i in range(combinations)], dtype=object),
+        coordinates=rng.random((supports, 3)),
+        reactions=reactions,
+        row_supports=np.zeros(0, dtype=np.int32),
+        row_combinations=np.zeros(0, dtype=np.int32),
+    )
+
+
+@pytest.fixture(scope='module')
+def example_store(example_path):
+    return from_frame(load_data(example_path))
+
+
+@pytest.fixture
+def scattered_store():
+    return random_store(40, 25)
+
+
+@pytest.mark.parametrize('store_fixture', ['example_store', 'scattered_store'])
+@pytest.mark.parametrize('capacities', [(600, -100), (300, -20), (600, None)])
+def test_design_matches_the_per_pile_loop(store_fixture, capacities, request):
+    store = request.getfixturevalue(store_fixture)
+    # A small chunk size so the supports are split over several chunks
+    groups = pile_groups.design_pile_groups(store, *capacities, chunk_elements=5000)
+
+    expected = reference_groups(store, *capacities)
+    assert groups['Number of Piles'].tolist() == [piles for piles, _, _, _ in expected]
+    np.testing.assert_allclose(groups['Max Pile Load'], [load for _, load, _, _ in expected])
+    np.testing.assert_allclose(groups['Min Pile Load'], [load for _, _, load, _ in expected])
+    assert groups['Max Pile Combination'].tolist() == [combination for _, _, _, combination in expected]
+
+
+def test_layouts_without_lever_arm_fail_under_moment():
+    store = random_store(3, 4)
+    store.reactions[:, :, 2] = 100.0
+    store.reactions[:, :, 3:5] = 0.0
+    # Mx only: a line along X has no lever arm about the X axis
+    store.reactions[1, :, 3] = 50.0
+    # My only: the 2 in line layout carries it
+    store.reactions[2, :, 4] = 50.0
+
+    groups = pile_groups.design_pile_groups(store, 600)
+
+    assert groups['Layout'].tolist() == ['Single pile', 'Triangle', '2 in line']
+
+
+def test_non_negative_tensile_capacity_is_rejected():
+    with pytest.raises(ValueError):
+        pile_groups.design_pile_groups(random_store(2, 2), 600, 0)
@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import project_store
+from functions import REACTION_COLUMNS, calculate_required_piles, generate_data_for_display, load_data
+
+
+@pytest.fixture(scope='module')
+def revisions(example_path):
+    # The example and a revision with 50 % more vertical load
+    first = load_data(example_path)
+    second = first.copy()
+    second['Fz [kN]'] *= 1.5
+    return {'A': first, 'B': second}
+
+
+@pytest.fixture
+def connection(revisions):
+    connection = project_store.connect(':memory:')
+    for day, (revision, df_data) in enumerate(revisions.items(), start=1):
+        project_store.ingest(connection, 'Tower B', revision, df_data, timestamp=datetime(2026, 1, day, tzinfo=timezone.utc),
+                             safe_pile_capacity=600.0, safe_pile_tensile_capacity=-100.0)
+    # A second project the queries of Tower B must not return
+    project_store.ingest(connection, 'Tower C', 'A', revisions['B'], safe_pile_capacity=600.0, reactions=False)
+    yield connection
+    connection.close()
+
+
+def test_supports_exceeding_a_threshold(connection, revisions):
+    threshold = 1000.0
+    result = project_store.supports_exceeding(connection, threshold, 'Fz', '+', project='Tower B')
+
+    expected = []
+    for revision, df_data in revisions.items():
+        new_df = generate_data_for_display(df_data)
+        exceeding = new_df[new_df['Max +Fz'] > threshold]
+        expected.extend((revision, support, value, combination) for support, value, combination
+                        in zip(exceeding['Support'], exceeding['Max +Fz'], exceeding['Max +Fz Combination']))
+    expected.sort(key=lambda row: (row[0], row[1]))
+
+    assert 0 < len(result) < 2 * len(generate_data_for_display(revisions['A']))
+    assert result['Revision'].tolist() == [row[0] for row in expected]
+    assert result['Support'].tolist() == [row[1] for row in expected]
+    np.testing.assert_allclose(result['Value'], [row[2] for row in expected])
+    assert result['Combination'].tolist() == [row[3] for row in expected]
+    assert set(project_store.supports_exceeding(connection, threshold)['Project']) == {'Tower B', 'Tower C'}
+
+
+def test_pile_trend_across_revisions(connection, revisions):
+    trend = project_store.pile_trend(connection, 'Tower B')
+
+    expected = [int(calculate_required_piles(generate_data_for_display(df_data), 600.0, -100.0).sum())
+                for df_data in revisions.values()]
+    assert trend['Revision'].tolist() == ['A', 'B']
+    assert trend['Total Piles'].tolist() == expected
+    assert expected[1] > expected[0]
+
+
+def test_support_history_and_reaction_rows(connection, revisions):
+    df_data = revisions['B']
+    support = df_data.index.get_level_values('Support')[0]
+    new_df = generate_data_for_display(df_data).set_index('Support')
+
+    history = project_store.support_history(connection, 'Tower B', support)
+    assert history['Revision'].tolist() == ['A', 'A', 'B', 'B']
+    last = history[history['Revision'] == 'B'].set_index('Sign')['Value']
+    assert last['+'] == pytest.approx(new_df.loc[support, 'Max +Fz'])
+    assert last['-'] == pytest.approx(new_df.loc[support, 'Max -Fz'])
+
+    rows = project_store.reaction_rows(connection, 'Tower B', 'B')
+    assert rows['Combination'].tolist() == df_data['Combination'].astype(str).tolist()
+    pd.testing.assert_frame_equal(rows[REACTION_COLUMNS], df_data[REACTION_COLUMNS].reset_index(drop=True).astype(float))
+
+
+def test_ingesting_a_revision_again_replaces_it(connection, revisions):
+    project_store.ingest(connection, 'Tower B', 'B', revisions['A'], safe_pile_capacity=600.0)
+    assert project_store.revisions(connection, 'Tower B')['Revision'].tolist() == ['A', 'B']
+    assert connection.execute('SELECT COUNT(*) FROM reactions').fetchone()[0] == 2 * len(revisions['A'])
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from functions import load_data
+from revisions import analyse, reanalyse
+
+
+@pytest.fixture(scope='module')
+def example(example_path):
+    return load_data(example_path)
+
+
+def assert_matches_full_analysis(result, df_data):
+    full = analyse(df_data, 600.0, -100.0)
+    pd.testing.assert_frame_equal(result['new_df'].reset_index(drop=True), full['new_df'], check_dtype=False)
+    assert result['piles'].to_dict() == full['piles'].to_dict()
+
+
+def test_removed_support_only_changes_the_support_diff(example):
+    previous = analyse(example, 600.0, -100.0)
+    support = example.index.get_level_values('Support')[0]
+    revised = example.drop(index=support, level='Support')
+
+    result, diff = reanalyse(previous, revised, 600.0, -100.0)
+
+    assert diff['removed_supports'] == [support]
+    assert diff['changed_supports'] == []
+    assert diff['changed_combinations'] == []
+    assert diff['added_combinations'] == diff['removed_combinations'] == []
+    assert_matches_full_analysis(result, revised)
+
+
+def test_single_value_change(example):
+    previous = analyse(example, 600.0, -100.0)
+    revised = example.copy()
+    revised.iloc[3, revised.columns.get_loc('Fz [kN]')] += 5000.0
+    support = revised.index.get_level_values('Support')[3]
+    combination = revised['Combination'].iloc[3]
+
+    result, diff = reanalyse(previous, revised, 600.0, -100.0)
+
+    assert diff['changed_supports'] == [support]
+    assert diff['changed_combinations'] == [combination]
+    assert support in diff['pile_changes']['Support'].tolist()
+    governing = diff['governing_changes']
+    assert governing[(governing['Support'] == support) & (governing['Envelope'] == 'Max +Fz')]['New Combination'].tolist() == [combination]
+    assert_matches_full_analysis(result, revised)
+
+
+def test_unchanged_revision(example):
+    previous = analyse(example, 600.0, -100.0)
+    result, diff = reanalyse(previous, example.copy(), 600.0, -100.0)
+    assert not any(len(diff[key]) for key in diff)
+    assert np.array_equal(result['piles'].to_numpy(), previous['piles'].to_numpy())
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+from functions import generate_data_for_display, load_data
+from spatial import build_spatial_index
+
+
+@pytest.fixture(scope='module')
+def example_df(example_path):
+    return generate_data_for_display(load_data(example_path))
+
+
+@pytest.fixture
+def scattered_df():
+    # Random supports on two levels, some without coordinates
+    rng = np.random.default_rng(0)
+    supports = 200
+    new_df = pd.DataFrame({
+        'Support': [f'S{i}' for i in range(supports)],
+        'X Coordinate': rng.uniform(0, 50, supports).round(1),
+        'Y Coordinate': rng.uniform(0, 30, supports).round(1),
+        'Z Coordinate': rng.choice([0.0, 3.5], supports),
+        'Max +Fz': rng.uniform(0, 500, supports),
+        'Max -Fz': -rng.uniform(0, 50, supports),
+    })
+    new_df.loc[[3, 50, 51], 'X Coordinate'] = np.nan
+    new_df.loc[[7], 'Y Coordinate'] = np.nan
+    return new_df
+
+
+def coordinates(new_df):
+    return new_df['X Coordinate'].to_numpy(dtype=float), new_df['Y Coordinate'].to_numpy(dtype=float)
+
+
+@pytest.mark.parametrize('frame', ['example_df', 'scattered_df'])
+def test_within_box_matches_brute_force(frame, request):
+    new_df = request.getfixturevalue(frame)
+    index = build_spatial_index(new_df)
+    x, y = coordinates(new_df)
+    min_x, min_y, max_x, max_y = np.nanmin(x), np.nanmin(y), np.nanmax(x), np.nanmax(y)
+    box = (min_x + 0.2 * (max_x - min_x), min_y, min_x + 0.7 * (max_x - min_x), min_y + 0.6 * (max_y - min_y))
+
+    inside = (x >= box[0]) & (x <= box[2]) & (y >= box[1]) & (y <= box[3])
+    assert index.query(shapely.box(*box)).tolist() == np.flatnonzero(inside).tolist()
+    assert index.within_box(*box)['Support'].tolist() == new_df['Support'][inside].tolist()
+
+    z = new_df['Z Coordinate'].iloc[0]
+    on_level = inside & (new_df['Z Coordinate'].to_numpy() == z)
+    assert index.query(shapely.box(*box), z=z).tolist() == np.flatnonzero(on_level).tolist()
+
+
+@pytest.mark.parametrize('frame', ['example_df', 'scattered_df'])
+@pytest.mark.parametrize('k', [1, 5, 1000])
+def test_nearest_positions_match_brute_force(frame, k, request):
+    new_df = request.getfixturevalue(frame)
+    index = build_spatial_index(new_df)
+    x, y = coordinates(new_df)
+    located = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+
+    for point in [(np.nanmean(x), np.nanmean(y)), (-10.0, 100.0)]:
+        distances = np.hypot(x[located] - point[0], y[located] - point[1])
+        expected = np.sort(distances)[:k]
+
+        positions, found = index.nearest_positions(*point, k=k)
+
+        assert len(positions) == min(k, len(located))
+        np.testing.assert_allclose(found, expected)
+        np.testing.assert_allclose(np.hypot(x[positions] - point[0], y[positions] - point[1]), found)
+
+
+@pytest.mark.parametrize('frame', ['example_df', 'scattered_df'])
+@pytest.mark.parametrize('distance', [0.0, 2.0, 6.0])
+def test_clusters_match_brute_force(frame, distance, request):
+    new_df = request.getfixturevalue(frame)
+    index = build_spatial_index(new_df)
+    x, y = coordinates(new_df)
+
+    # Connected components of the pairs within `distance`, by repeated merging
+    near = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :]) <= distance
+    labels = list(range(len(new_df)))
+    for i, j in zip(*np.nonzero(near)):
+        old, new = max(labels[i], labels[j]), min(labels[i], labels[j])
+        labels = [new if label == old else label for label in labels]
+    expected = pd.factorize(np.array(labels))[0]
+
+    assert index.clusters(distance).tolist() == expected.tolist()
+
+
+def test_supports_without_coordinates_are_skipped(scattered_df):
+    index = build_spatial_index(scattered_df)
+    assert index.located == len(scattered_df) - 4
+
+    positions, _ = index.nearest_positions(0.0, 0.0, k=len(scattered_df))
+    assert len(positions) == index.located
+    assert not set(positions) & {3, 7, 50, 51}